@@ -1,7 +1,8 @@
-# Import key functions from auto_rqa, cross_rqa, and multivariate_rqa
+# Import key functions from autoRQA, crossRQA, multivariateRQA and diagonalRP
 from autoRQA import autoRQA
 from crossRQA import crossRQA
-from multivariateRQA import multivariateRQA, multivariateXRQA
+from multivariateRQA import multivariateRQA, multivariateCrossRQA
+from diagonalRP import DRP, crossDRP
 
 # Optionally import utilities for advanced users
 from .utils.norm_utils import normalize_data
@@ -13,7 +14,9 @@ __all__ = [
     "autoRQA",
     "crossRQA",
     "multivariateRQA",
-    "multivariateXRQA",
+    "multivariateCrossRQA",
+    "DRP",
+    "crossDRP",
     "normalize_data",
     "plot_rqa_results",
     "write_rqa_stats"
@@ -1,5 +1,5 @@
 from utils import norm_utils, plot_utils, output_io_utils
-from utils import rqa_utils_cpp
+from utils import rqa_utils_cpp, rqa_utils_gpu, rqa_utils_cache
 import os
 
 def autoRQA(data, params):
@@ -7,29 +7,43 @@ def autoRQA(data, params):
     # Normalize data
     dataX = norm_utils.normalize_data(data, params['norm'])
 
-    # Perform RQA computations
-    ds = rqa_utils_cpp.rqa_dist(dataX, dataX, dim=params['eDim'], lag=params['tLag'])
+    plot_mode = params.get('plotMode', 'rp')
+    dim, lag = params['eDim'], params['tLag']
+    metric = params.get('metric', 'euclidean')
+    # td and mats are only built when they will be used
+    keep_matrices = params.get('doPlots', True) or plot_mode in ('rp', 'rp-timeseries')
+    # Reuse a distance matrix already computed for this data (e.g. by DRP)
+    ds = rqa_utils_cache.lookup(dataX, dataX, dim, lag, metric)
+    if ds is None and params.get('useGPU', False) and rqa_utils_gpu.is_available():
+        # Distance matrix on the GPU, RQA measures on the CPU
+        ds = rqa_utils_gpu.rqa_dist_gpu(dataX, dataX, dim=dim, lag=lag, metric=metric)
+    elif ds is None and params.get('cacheDist', False):
+        ds = rqa_utils_cache.rqa_dist(dataX, dataX, dim=dim, lag=lag, metric=metric)
 
-    # Similarly, you can call xRQA_stats:
-    td, rs, mats, err_code = rqa_utils_cpp.rqa_stats(
-        ds["d"], rescale=params['rescaleNorm'], rad=params['radius'], 
-        diag_ignore=params['tw'], minl=params['minl'], rqa_mode="auto"
-        )
+    if ds is not None:
+        td, rs, mats, err_code = rqa_utils_cpp.rqa_stats(
+            ds["d"], rescale=params['rescaleNorm'], rad=params['radius'],
+            diag_ignore=params['tw'], minl=params['minl'], rqa_mode="auto",
+            return_matrices=keep_matrices
+            )
+    else:
+        # Fused distance + RQA computation
+        td, rs, mats, err_code = rqa_utils_cpp.rqa_dist_stats(
+            dataX, dataX, dim=dim, lag=lag,
+            rescale=params['rescaleNorm'], rad=params['radius'],
+            diag_ignore=params['tw'], minl=params['minl'], rqa_mode="auto",
+            return_matrices=keep_matrices, metric=metric
+            )
 
     ## Print stats
     if err_code == 0:
-        if params['showMetrics']:
-            print(f"%REC: {float(rs['perc_recur']):.3f} | %DET: {float(rs['perc_determ']):.3f} | MaxLine: {float(rs['maxl_found']):.2f}")
-            print(f"Mean Line Length: {float(rs['mean_line_length']):.2f} | SD Line Length: {float(rs['std_line_length']):.2f} | Line Count: {float(rs['count_line']):.2f}")
-            print(f"ENTR: {float(rs['entropy']):.3f} | LAM: {float(rs['laminarity']):.3f} | TT: {float(rs['trapping_time']):.3f}")
-            print(f"Vmax: {float(rs['vmax']):.2f} | Divergence: {float(rs['divergence']):.3f}") 
-            print(f"Trend_Lower: {float(rs['trend_lower_diag']):.3f} | Trend_Upper {float(rs['trend_upper_diag']):.3f}")
+        if params.get('showMetrics', False):
+            output_io_utils.print_rqa_metrics(rs)
     else:
         print("Error in RQA computation. Check parameters and data.")
 
     # Plot results
     # plotMode: 'none', 'rp', 'rp_timeseries',
-    plot_mode = params.get('plotMode', 'rp')
     if plot_mode in ('rp', 'rp-timeseries'):
         save_path = None
         if params.get('saveFig', False):
@@ -41,7 +55,8 @@ def autoRQA(data, params):
             td=td,
             plot_mode=plot_mode,
             point_size=params['pointSize'],
-            save_path=save_path 
+            save_path=save_path,
+            backend=params.get('rpBackend', 'imshow')
         )
 
     # Write stats
@@ -1,5 +1,5 @@
 from utils import norm_utils, plot_utils, output_io_utils
-from utils import rqa_utils_cpp
+from utils import rqa_utils_cpp, rqa_utils_gpu, rqa_utils_cache
 import os
 
 def crossRQA(data1, data2, params):
@@ -10,27 +10,45 @@ def crossRQA(data1, data2, params):
         data2 (np.ndarray): Time series data 2.
         params (dict): Dictionary of RQA parameters:
                        - norm, eDim, tLag, rescaleNorm, radius, tmin, minl,
-                         doPlots, plotMode, phaseSpace, doStatsFile
+                         doPlots, plotMode, phaseSpace, doStatsFile, useGPU,
+                         cacheDist
     """
 
     # Normalize data
     dataX1 = norm_utils.normalize_data(data1, params['norm'])
     dataX2 = norm_utils.normalize_data(data2, params['norm'])
 
-    # Compute distance maxtrix for RQA
-    ds = rqa_utils_cpp.rqa_dist(dataX1, dataX2, dim=params['eDim'], lag=params['tLag'])
+    dim, lag = params['eDim'], params['tLag']
+    metric = params.get('metric', 'euclidean')
+    # td and mats are only built when they will be used
+    keep_matrices = params.get('doPlots', True) or 'rp' in params['plotMode']
+    # Reuse a distance matrix already computed for this pair (e.g. by crossDRP)
+    ds = rqa_utils_cache.lookup(dataX1, dataX2, dim, lag, metric)
+    if ds is None and params.get('useGPU', False) and rqa_utils_gpu.is_available():
+        # Distance matrix on the GPU, CRQA measures on the CPU
+        ds = rqa_utils_gpu.rqa_dist_gpu(dataX1, dataX2, dim=dim, lag=lag, metric=metric)
+    elif ds is None and params.get('cacheDist', False):
+        ds = rqa_utils_cache.rqa_dist(dataX1, dataX2, dim=dim, lag=lag, metric=metric)
 
-    # Perform CRQA calculations
-    td, rs, mats, err_code = rqa_utils_cpp.rqa_stats(ds["d"], rescale=params['rescaleNorm'], rad=params['radius'], diag_ignore=0, minl=params['minl'], rqa_mode="cross")
+    if ds is not None:
+        td, rs, mats, err_code = rqa_utils_cpp.rqa_stats(
+            ds["d"], rescale=params['rescaleNorm'], rad=params['radius'],
+            diag_ignore=0, minl=params['minl'], rqa_mode="cross",
+            return_matrices=keep_matrices
+            )
+    else:
+        # Fused distance + CRQA computation
+        td, rs, mats, err_code = rqa_utils_cpp.rqa_dist_stats(
+            dataX1, dataX2, dim=dim, lag=lag,
+            rescale=params['rescaleNorm'], rad=params['radius'],
+            diag_ignore=0, minl=params['minl'], rqa_mode="cross",
+            return_matrices=keep_matrices, metric=metric
+            )
 
     # Print stats
     if err_code == 0:
-        if params['showMetrics']:
-            print(f"%REC: {float(rs['perc_recur']):.3f} | %DET: {float(rs['perc_determ']):.3f} | MaxLine: {float(rs['maxl_found']):.2f}")
-            print(f"Mean Line Length: {float(rs['mean_line_length']):.2f} | SD Line Length: {float(rs['std_line_length']):.2f} | Line Count: {float(rs['count_line']):.2f}")
-            print(f"ENTR: {float(rs['entropy']):.3f} | LAM: {float(rs['laminarity']):.3f} | TT: {float(rs['trapping_time']):.3f}")
-            print(f"Vmax: {float(rs['vmax']):.2f} | Divergence: {float(rs['divergence']):.3f}") 
-            print(f"Trend_Lower: {float(rs['trend_lower_diag']):.3f} | Trend_Upper {float(rs['trend_upper_diag']):.3f}")
+        if params.get('showMetrics', False):
+            output_io_utils.print_rqa_metrics(rs)
     else:
         print("Error in RQA computation. Check parameters and data.")
 
@@ -47,7 +65,8 @@ def crossRQA(data1, data2, params):
             td=td,
             plot_mode=params['plotMode'],
             point_size=params['pointSize'],
-            save_path=save_path  
+            save_path=save_path,
+            backend=params.get('rpBackend', 'imshow')
         )
     # Write stats
     if params['doStatsFile']:
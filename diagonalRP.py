@@ -1,5 +1,5 @@
 from utils import norm_utils, plot_utils, output_io_utils
-from utils import rqa_utils_cpp
+from utils import rqa_utils_cpp, rqa_utils_cache
 import numpy as np
 import os
 
@@ -46,21 +46,24 @@ def DRP(data, params, mode="auto"):
         dataX = norm_utils.normalize_data(data, params['norm'])
         dataY = dataX
 
-    # Distance & recurrence
-    ds = rqa_utils_cpp.rqa_dist(dataX, dataY, dim=params['eDim'], lag=params['tLag'])
+    # Distance & recurrence (cached, so a following autoRQA/crossRQA on the same data reuses it)
+    ds = rqa_utils_cache.rqa_dist(dataX, dataY, dim=params['eDim'], lag=params['tLag'],
+                                  metric=params.get('metric', 'euclidean'))
     diag_ignore = params.get('tw', 0) if mode == "auto" else 0
-    td = rqa_utils_cpp.rqa_radius(ds["d"], params['rescaleNorm'], params['radius'], diag_ignore)
+    n = ds["d"].shape[0]
+    bits = rqa_utils_cpp.rqa_radius_packed(ds["d"], params['rescaleNorm'], params['radius'], diag_ignore)
 
-    # DRP
-    drp = rqa_utils_cpp.rqa_drp(td)
-    lags = np.arange(-(td.shape[0] - 1), td.shape[0])
-
-    # Truncate if maxLag is set
+    # DRP, computed only over |lag| <= maxLag when it is set
     maxLag = params.get('maxLag', None)
-    if maxLag is not None:
-        mask = np.abs(lags) <= maxLag
-        lags = lags[mask]
-        drp = drp[mask]
+    if maxLag is None:
+        band = n - 1
+    else:
+        band = min(int(np.floor(maxLag)), n - 1)
+    if band >= 0:
+        drp = rqa_utils_cpp.rqa_drp_packed(bits, n, max_lag=band)
+    else:
+        drp = np.empty(0)
+    lags = np.arange(-band, band + 1)
 
     # Show metrics
     if params.get('showMetrics', False) and len(drp) > 0:
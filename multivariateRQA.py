@@ -11,7 +11,7 @@ def multivariateRQA(data, params, mode="auto"):
         data (np.ndarray): 2D array of shape (time_points, dimensions) or 
                           list of 1D arrays for each dimension
         params (dict): Dictionary of RQA parameters:
-                       - norm, rescaleNorm, radius, tw, minl,
+                       - norm, rescaleNorm, radius, tw, minl, doPlots,
                          showMetrics, plotMode, pointSize, saveFig, doStatsFile
         mode (str): "auto" for auto-RQA or "cross" for cross-RQA (requires data to be [data1, data2])
     
@@ -41,6 +41,11 @@ def multivariateRQA(data, params, mode="auto"):
         if data.shape[1] < 2:
             raise ValueError("Multivariate RQA requires at least 2 dimensions.")
     
+    # td and mats are only built when they will be used
+    plot_mode = params.get('plotMode', 'rp')
+    keep_matrices = params.get('doPlots', True) or plot_mode in ('rp', 'rp-timeseries')
+    metric = params.get('metric', 'euclidean')
+
     if mode == "cross":
         # Normalize data separately
         dataX1 = norm_utils.normalize_data(data1, params['norm'])
@@ -52,17 +57,17 @@ def multivariateRQA(data, params, mode="auto"):
         if dataX2.ndim == 1:
             dataX2 = dataX2.reshape(-1, 1)
         
-        # Compute multivariate distance matrix
-        ds = rqa_utils_cpp.rqa_dist_multivariate(dataX1.astype(np.float32), dataX2.astype(np.float32))
-        
-        # Perform CRQA calculations
-        td, rs, mats, err_code = rqa_utils_cpp.rqa_stats(
-            ds["d"], rescale=params['rescaleNorm'], rad=params['radius'], 
-            diag_ignore=0, minl=params['minl'], rqa_mode="cross"
+        # Fused multivariate distance + CRQA computation
+        td, rs, mats, err_code = rqa_utils_cpp.rqa_dist_multivariate_stats(
+            dataX1.astype(np.float32), dataX2.astype(np.float32),
+            rescale=params['rescaleNorm'], rad=params['radius'], 
+            diag_ignore=0, minl=params['minl'], rqa_mode="cross",
+            return_matrices=keep_matrices, metric=metric
         )
         
         analysis_type = "MultivariateX-RQA"
         plot_data = [dataX1, dataX2]
+        n_dims = dataX1.shape[1]
         
     else:  # auto mode
         # Normalize data
@@ -72,33 +77,29 @@ def multivariateRQA(data, params, mode="auto"):
         if dataX.ndim == 1:
             dataX = dataX.reshape(-1, 1)
         
-        # Compute multivariate distance matrix
-        ds = rqa_utils_cpp.rqa_dist_multivariate(dataX.astype(np.float32), dataX.astype(np.float32))
-        
-        # Perform RQA calculations
+        # Fused multivariate distance + RQA computation
         tw = params.get('tw', 1)  # Default theiler window
-        td, rs, mats, err_code = rqa_utils_cpp.rqa_stats(
-            ds["d"], rescale=params['rescaleNorm'], rad=params['radius'], 
-            diag_ignore=tw, minl=params['minl'], rqa_mode="auto"
+        dataX32 = dataX.astype(np.float32)
+        td, rs, mats, err_code = rqa_utils_cpp.rqa_dist_multivariate_stats(
+            dataX32, dataX32,
+            rescale=params['rescaleNorm'], rad=params['radius'], 
+            diag_ignore=tw, minl=params['minl'], rqa_mode="auto",
+            return_matrices=keep_matrices, metric=metric
         )
         
         analysis_type = "MultivariateRQA"
         plot_data = [dataX]
+        n_dims = dataX.shape[1]
     
     # Print stats
     if err_code == 0:
-        if params.get('showMetrics', True):
-            print(f"%REC: {float(rs['perc_recur']):.3f} | %DET: {float(rs['perc_determ']):.3f} | MaxLine: {float(rs['maxl_found']):.2f}")
-            print(f"Mean Line Length: {float(rs['mean_line_length']):.2f} | SD Line Length: {float(rs['std_line_length']):.2f} | Line Count: {float(rs['count_line']):.2f}")
-            print(f"ENTR: {float(rs['entropy']):.3f} | LAM: {float(rs['laminarity']):.3f} | TT: {float(rs['trapping_time']):.3f}")
-            print(f"Vmax: {float(rs['vmax']):.2f} | Divergence: {float(rs['divergence']):.3f}") 
-            print(f"Trend_Lower: {float(rs['trend_lower_diag']):.3f} | Trend_Upper {float(rs['trend_upper_diag']):.3f}")
-            print(f"Dimensions: {ds['dim']} | Analysis: {analysis_type}")
+        if params.get('showMetrics', False):
+            output_io_utils.print_rqa_metrics(
+                rs, extra_lines=[f"Dimensions: {n_dims} | Analysis: {analysis_type}"])
     else:
         print("Error in multivariate RQA computation. Check parameters and data.")
     
     # Plot results
-    plot_mode = params.get('plotMode', 'rp')
     if plot_mode in ('rp', 'rp-timeseries'):
         save_path = None
         if params.get('saveFig', False):
@@ -112,7 +113,8 @@ def multivariateRQA(data, params, mode="auto"):
                 td=td,
                 plot_mode=plot_mode,
                 point_size=params.get('pointSize', 1),
-                save_path=save_path
+                save_path=save_path,
+                backend=params.get('rpBackend', 'imshow')
             )
         else:
             plot_utils.plot_rqa_results(
@@ -120,7 +122,8 @@ def multivariateRQA(data, params, mode="auto"):
                 td=td,
                 plot_mode=plot_mode,
                 point_size=params.get('pointSize', 1),
-                save_path=save_path
+                save_path=save_path,
+                backend=params.get('rpBackend', 'imshow')
             )
     
     # Write stats
@@ -1,6 +1,11 @@
 from setuptools import setup, Extension, find_packages
 import pybind11
 import os
+import sys
+
+# OpenMP for the parallel distance kernels (Apple clang and MSVC builds
+# fall back to the serial code paths).
+openmp_args = ["-fopenmp"] if sys.platform.startswith("linux") else []
 
 ext_modules = [
     Extension(
@@ -8,7 +13,9 @@ ext_modules = [
         [os.path.join("utils", "rqa_utils.cpp")],
         include_dirs=[pybind11.get_include()],
         language="c++",
-        extra_compile_args=["-std=c++14"]  # or "-std=c++17"
+        # -ffp-contract=off keeps the SIMD and scalar distance kernels bit-identical
+        extra_compile_args=["-std=c++14", "-ffp-contract=off"] + openmp_args,  # or "-std=c++17"
+        extra_link_args=openmp_args
     )
 ]
 
@@ -20,8 +27,12 @@ setup(
         'numpy',
         'pandas',
         'matplotlib',
-        'scipy',
     ],
+    extras_require={
+        'numba': ['numba'],
+        'gpu': ['cupy'],
+        'datashader': ['datashader'],
+    },
     ext_modules=ext_modules,
     description='A package for Recurrence Quantification Analysis (RQA)',
     author='Mike Richardson and Cathy Macpherson',
@@ -6,8 +6,6 @@ from output_io_utils  import write_rqa_stats
 # Expose only the necessary functions in the namespace
 __all__ = [
     "normalize_data",
-    "xRQA_dist",
-    "xRQA_stats",
     "plot_rqa_results",
     "write_rqa_stats"
 ]
@@ -1,5 +1,78 @@
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy path below is used instead
+    njit = None
+
+# fastmath without 'nnan'/'ninf' so constant columns still give inf/nan like NumPy
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=_FASTMATH, cache=True)
+    def _minmax_njit(data):
+        n, m = data.shape
+        lo = np.empty(m)
+        inv_rng = np.empty(m)
+        for j in prange(m):
+            vmin = data[0, j]
+            vmax = data[0, j]
+            for i in range(1, n):
+                v = data[i, j]
+                if v < vmin:
+                    vmin = v
+                if v > vmax:
+                    vmax = v
+            lo[j] = vmin
+            inv_rng[j] = 1.0 / (vmax - vmin)
+        out = np.empty_like(data)
+        for i in prange(n):
+            for j in range(m):
+                out[i, j] = (data[i, j] - lo[j]) * inv_rng[j]
+        return out
+
+    @njit(parallel=True, fastmath=_FASTMATH, cache=True)
+    def _zscore_njit(data):
+        n, m = data.shape
+        mu = np.empty(m)
+        inv_std = np.empty(m)
+        for j in prange(m):
+            # Welford's running mean / M2
+            mean = 0.0
+            m2 = 0.0
+            for i in range(n):
+                v = data[i, j]
+                delta = v - mean
+                mean += delta / (i + 1)
+                m2 += delta * (v - mean)
+            mu[j] = mean
+            inv_std[j] = 1.0 / np.sqrt(m2 / n)
+        out = np.empty_like(data)
+        for i in prange(n):
+            for j in range(m):
+                out[i, j] = (data[i, j] - mu[j]) * inv_std[j]
+        return out
+
+    @njit(parallel=True, fastmath=_FASTMATH, cache=True)
+    def _center_njit(data):
+        n, m = data.shape
+        mu = np.empty(m)
+        for j in prange(m):
+            total = 0.0
+            for i in range(n):
+                total += data[i, j]
+            mu[j] = total / n
+        out = np.empty_like(data)
+        for i in prange(n):
+            for j in range(m):
+                out[i, j] = data[i, j] - mu[j]
+        return out
+
+    _NJIT_KERNELS = {"minmax": _minmax_njit, "zscore": _zscore_njit, "center": _center_njit}
+else:
+    _NJIT_KERNELS = {}
+
 def normalize_data(data, norm="none"):
     """
     Normalise data according to the specified method.
@@ -31,21 +104,31 @@ def normalize_data(data, norm="none"):
     if isinstance(norm, int):
         norm = mapping.get(norm, f"INVALID_INT_{norm}")
 
+    if norm in ("minmax", "zscore", "center"):
+        # Integer input has no in-place division; promote once up front.
+        if not np.issubdtype(data.dtype, np.floating):
+            data = data.astype(np.float64)
+        axis = 0 if data.ndim > 1 else None
+
+        # Fused single-pass kernels when numba is installed (2D: time x dims)
+        if norm in _NJIT_KERNELS and isinstance(data, np.ndarray) and data.ndim in (1, 2):
+            out = _NJIT_KERNELS[norm](data.reshape(data.shape[0], -1))
+            return out.reshape(data.shape)
+
     if norm == "minmax":
-        if data.ndim == 1:
-            return (data - np.min(data)) / (np.max(data) - np.min(data))
-        else:
-            return (data - np.min(data, axis=0)) / (np.max(data, axis=0) - np.min(data, axis=0))
+        lo = data.min(axis=axis)
+        rng = data.max(axis=axis) - lo
+        out = np.subtract(data, lo)
+        out /= rng
+        return out
     elif norm == "zscore":
-        if data.ndim == 1:
-            return (data - np.mean(data)) / np.std(data)
-        else:
-            return (data - np.mean(data, axis=0)) / np.std(data, axis=0)
+        mu = data.mean(axis=axis)
+        inv_std = 1.0 / data.std(axis=axis)
+        out = np.subtract(data, mu)
+        out *= inv_std
+        return out
     elif norm == "center":
-        if data.ndim == 1:
-            return data - np.mean(data)
-        else:
-            return data - np.mean(data, axis=0)
+        return np.subtract(data, data.mean(axis=axis))
     elif norm == "none":
         return data
     else:
@@ -1,50 +1,96 @@
+import atexit
 import os
+import sys
+import numpy as np
+
+# Stats files stay open for the life of the process, so repeated calls
+# (windowed/rolling analyses) cost one write instead of stat + open + close.
+_handles = {}
+
+
+def _stats_handle(stats_file, header):
+    f = _handles.get(stats_file)
+    if f is None or f.closed:
+        # Write header only if the file doesn't exist
+        file_exists = os.path.exists(stats_file)
+        f = open(stats_file, "a")
+        if not file_exists:
+            f.write(header)
+        _handles[stats_file] = f
+    return f
+
+
+def close_stats_files():
+    """
+    Close the stats files held open by write_rqa_stats/write_drp_profile.
+    Called automatically at interpreter exit; the next write reopens them.
+    """
+    for f in _handles.values():
+        f.close()
+    _handles.clear()
+
+
+atexit.register(close_stats_files)
+
+def print_rqa_metrics(rs, extra_lines=()):
+    """
+    Print the RQA measures in rs to the console as one block (one write
+    instead of a print call per line). extra_lines are appended verbatim.
+    """
+    lines = [
+        f"%REC: {float(rs['perc_recur']):.3f} | %DET: {float(rs['perc_determ']):.3f} | MaxLine: {float(rs['maxl_found']):.2f}",
+        f"Mean Line Length: {float(rs['mean_line_length']):.2f} | SD Line Length: {float(rs['std_line_length']):.2f} | Line Count: {float(rs['count_line']):.2f}",
+        f"ENTR: {float(rs['entropy']):.3f} | LAM: {float(rs['laminarity']):.3f} | TT: {float(rs['trapping_time']):.3f}",
+        f"Vmax: {float(rs['vmax']):.2f} | Divergence: {float(rs['divergence']):.3f}",
+        f"Trend_Lower: {float(rs['trend_lower_diag']):.3f} | Trend_Upper {float(rs['trend_upper_diag']):.3f}",
+    ]
+    lines.extend(extra_lines)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 # Function: Write stats to file
 def write_rqa_stats(filename, params, rs, err_code):
     stats_file = "RQA_Stats.csv"
-
-    # Write header only if the file doesn't exist
-    if not os.path.exists(stats_file):
-        with open(stats_file, "w") as f:
-            f.write("filename,eDim,tLag,rescale,radius,perc_recur,perc_determ,maxl_found,"
-                    "mean_line,std_line,count_line,entropy,laminarity,trapping_time,"
-                    "vmax,divergence,trend_lower_diag,trend_upper_diag\n")
+    f = _stats_handle(
+        stats_file,
+        "filename,eDim,tLag,rescale,radius,perc_recur,perc_determ,maxl_found,"
+        "mean_line,std_line,count_line,entropy,laminarity,trapping_time,"
+        "vmax,divergence,trend_lower_diag,trend_upper_diag\n")
 
     # Append results
-    with open(stats_file, "a") as f:
-        f.write(f"{filename}, {params['eDim']}, {params['tLag']}, {params['rescaleNorm']}, {params['radius'] * 100}, ")
-        if err_code == 0:
-            f.write(
-                f"{rs['perc_recur']:.3f}, {rs['perc_determ']:.3f}, {rs['maxl_found']:.2f}, "
-                f"{rs['mean_line_length']:.2f}, {rs['std_line_length']:.2f}, {rs['count_line']:.0f}, "
-                f"{rs['entropy']:.3f}, {rs['laminarity']:.3f}, {rs['trapping_time']:.3f}, "
-                f"{rs['vmax']:.2f}, {rs['divergence']:.3f}, "
-                f"{rs['trend_lower_diag']:.3f}, {rs['trend_upper_diag']:.3f}\n"
-            )
-        else:
-            f.write("0.0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0\n")
+    row = f"{filename}, {params['eDim']}, {params['tLag']}, {params['rescaleNorm']}, {params['radius'] * 100}, "
+    if err_code == 0:
+        row += (
+            f"{rs['perc_recur']:.3f}, {rs['perc_determ']:.3f}, {rs['maxl_found']:.2f}, "
+            f"{rs['mean_line_length']:.2f}, {rs['std_line_length']:.2f}, {rs['count_line']:.0f}, "
+            f"{rs['entropy']:.3f}, {rs['laminarity']:.3f}, {rs['trapping_time']:.3f}, "
+            f"{rs['vmax']:.2f}, {rs['divergence']:.3f}, "
+            f"{rs['trend_lower_diag']:.3f}, {rs['trend_upper_diag']:.3f}\n"
+        )
+    else:
+        row += "0.0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0\n"
+    f.write(row)
+    f.flush()
 
 def write_drp_profile(filename, params, lags, drp):
     """
     Save full DRP profile (lags + %REC values) to CSV,
     with metadata written into each row.
     """
-    import os
     stats_file = "DRP_Profile.csv"
-    file_exists = os.path.exists(stats_file)
-
-    if not file_exists:
-        with open(stats_file, "w") as f:
-            f.write("filename,eDim,tLag,rescale,radius,lag,perc_recur\n")
-
-    with open(stats_file, "a") as f:
-        for lag, val in zip(lags, drp):
-            f.write(
-                f"{filename}, {params['eDim']}, {params['tLag']}, "
-                f"{params['rescaleNorm']}, {params['radius'] * 100}, "
-                f"{lag}, {val:.6f}\n"
-            )
+    f = _stats_handle(stats_file, "filename,eDim,tLag,rescale,radius,lag,perc_recur\n")
+
+    # One savetxt call for the whole profile; the metadata is a constant
+    # leading column
+    meta = (
+        f"{filename}, {params['eDim']}, {params['tLag']}, "
+        f"{params['rescaleNorm']}, {params['radius'] * 100}, "
+    )
+    block = np.empty((len(lags), 3), dtype=object)
+    block[:, 0] = meta
+    block[:, 1] = lags
+    block[:, 2] = drp
+    np.savetxt(f, block, fmt="%s%d, %.6f")
+    f.flush()
 
     print(f"DRP profile written to {stats_file}")
 
@@ -1,65 +1,117 @@
+import os
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
+from matplotlib.colors import ListedColormap
 import numpy as np
+import pandas as pd
+
+try:
+    import datashader
+except ImportError:  # datashader is optional; the RP falls back to _rp_image
+    datashader = None
+
+# Recurrence plot colours: 0 -> background, 1 -> recurrence
+_RP_CMAP = ListedColormap(['white', 'red'])
+# Largest RP image (per side) handed to matplotlib; more cells than this
+# cannot be told apart on screen or in a 300 dpi figure
+_RP_MAX_PIXELS = 2048
+
+
+def _rp_image(td, max_pixels=_RP_MAX_PIXELS):
+    """
+    Recurrence matrix as a bool image for imshow, without copying td.
+
+    Matrices larger than max_pixels per side are reduced by block maximum,
+    so a block is drawn as recurrent if any of its cells is.
+    """
+    img = td.view(np.bool_) if td.dtype.itemsize == 1 else td.astype(np.bool_)
+    factor = -(-max(img.shape) // max_pixels)
+    if factor > 1:
+        img = np.logical_or.reduceat(img, np.arange(0, img.shape[0], factor), axis=0)
+        img = np.logical_or.reduceat(img, np.arange(0, img.shape[1], factor), axis=1)
+    return img
+
+
+def _datashader_image(td, max_pixels=_RP_MAX_PIXELS):
+    """
+    Recurrence matrix rasterised by datashader: the recurrent points are
+    aggregated into at most max_pixels per side, a pixel being recurrent if
+    any point falls in it. Same layout as _rp_image (row 0 = lowest j).
+    """
+    h, w = td.shape
+    recur_y, recur_x = np.nonzero(td)
+    cvs = datashader.Canvas(plot_width=min(w, max_pixels), plot_height=min(h, max_pixels),
+                            x_range=(0, w), y_range=(0, h))
+    # Cell (i, j) covers [j, j + 1] x [i, i + 1], so aggregate its centre
+    points = pd.DataFrame({'x': recur_x + 0.5, 'y': recur_y + 0.5})
+    agg = cvs.points(points, 'x', 'y', agg=datashader.any())
+    return agg.values
+
 
 def plot_rqa_results(
     dataX=None, dataY=None, td=None,
     plot_mode='rp', point_size=4,
-    save_path=None):
+    save_path=None, backend='imshow'):
     """
     Plot RQA or CRQA results with aligned RP and TS width.
+
+    The recurrence matrix is drawn as a single image, so the cost does not
+    grow with the number of recurrent points (point_size is kept for
+    compatibility but no longer affects the RP). backend='datashader'
+    rasterises the recurrent points with datashader when it is installed
+    (falls back to 'imshow' otherwise).
     """
 
-    ax_ts_x = None
-    ax_ts_y = None
+    show_ts = 'timeseries' in plot_mode
+    has_y = dataY is not None
 
     N = len(dataX)
-    fig = plt.figure(figsize=(8, 9))  # Squarer figure to accommodate equal width
-    gs = gridspec.GridSpec(3, 2, width_ratios=[1, 12], height_ratios=[1, 12, 2], hspace=0.4, wspace=0.2)
+    if show_ts:
+        fig = plt.figure(figsize=(8, 9))  # Squarer figure to accommodate equal width
+        gs = gridspec.GridSpec(3, 2, width_ratios=[1, 12], height_ratios=[1, 12, 2], hspace=0.4, wspace=0.2)
+        ax_rp = fig.add_subplot(gs[1, 1])
+    else:
+        # RP only: a single axes, no grid layout to build
+        fig, ax_rp = plt.subplots(figsize=(8, 8))
 
     # === Recurrence Plot ===
-    ax_rp = fig.add_subplot(gs[1, 1])
-    #ax_rp.set_facecolor('#b0c4de')  # Light Steel Blue, a lighter navy shade
-    ax_rp.set_facecolor('white')  # White background
-
-    recur_y, recur_x = np.where(td == 1)
-    ax_rp.scatter(recur_x, recur_y, c='red', s=point_size, edgecolors='none')
+    # One AxesImage instead of one scatter marker per recurrence; cell (i, j)
+    # covers [j, j + 1] x [i, i + 1] like the old markers at (j, i)
+    if backend == 'datashader' and datashader is not None:
+        rp_img = _datashader_image(td)
+    else:
+        rp_img = _rp_image(td)
+    ax_rp.imshow(rp_img, origin='lower', cmap=_RP_CMAP, vmin=0, vmax=1,
+                 interpolation='nearest', aspect='equal',
+                 extent=[0, td.shape[1], 0, td.shape[0]])
     ax_rp.set_xlim([0, N])
     ax_rp.set_ylim([0, N])
-    ax_rp.set_title("Cross-Recurrence Plot" if dataY is not None else "Recurrence Plot", pad=8)
+    ax_rp.set_title("Cross-Recurrence Plot" if has_y else "Recurrence Plot", pad=8)
     ax_rp.set_xlabel("X(i)")
-    ax_rp.set_ylabel("Y(j)" if dataY is not None else "X(j)")
+    ax_rp.set_ylabel("Y(j)" if has_y else "X(j)")
 
-    # === Time Series X ===
-    if 'timeseries' in plot_mode:
+    if show_ts:
+        # === Time Series X ===
         ax_ts_x = fig.add_subplot(gs[2, 1], sharex=ax_rp)
         ax_ts_x.plot(np.arange(N), dataX[:N], color='tab:blue')
         ax_ts_x.set_xlim([0, N])
         ax_ts_x.set_title("Time Series X", fontsize=10)
         ax_ts_x.set_xlabel("Time")
         ax_ts_x.set_ylabel("X", rotation=0, labelpad=15)
+        fig.align_xlabels([ax_rp, ax_ts_x])
 
-    # === Time Series Y ===
-    if dataY is not None and 'timeseries' in plot_mode:
-        ax_ts_y = fig.add_subplot(gs[1, 0], sharey=ax_rp)
-        ax_ts_y.plot(dataY[:N], np.arange(N), color='tab:blue')
-        ax_ts_y.invert_xaxis()
-        ax_ts_y.set_ylim([0, N])
-        ax_ts_y.set_title("Time Series Y", fontsize=10)
-        ax_ts_y.set_ylabel("Time")
-        ax_ts_y.set_xlabel("Y", rotation=0, labelpad=15)
-
-    if 'timeseries' in plot_mode:
-        if ax_ts_x is not None:
-            fig.align_xlabels([ax_rp, ax_ts_x])
-        if ax_ts_y is not None:
+        # === Time Series Y ===
+        if has_y:
+            ax_ts_y = fig.add_subplot(gs[1, 0], sharey=ax_rp)
+            ax_ts_y.plot(dataY[:N], np.arange(N), color='tab:blue')
+            ax_ts_y.invert_xaxis()
+            ax_ts_y.set_ylim([0, N])
+            ax_ts_y.set_title("Time Series Y", fontsize=10)
+            ax_ts_y.set_ylabel("Time")
+            ax_ts_y.set_xlabel("Y", rotation=0, labelpad=15)
             fig.align_ylabels([ax_rp, ax_ts_y])
-    else:
-        fig.align_xlabels([ax_rp])
-        fig.align_ylabels([ax_rp])
 
     if save_path:
-        import os
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         
         # Determine file extension
@@ -107,7 +159,6 @@ def plot_drp_results(
     ax.legend(loc="best")
 
     if save_path:
-        import os
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
         print(f"Plot saved to: {save_path}")
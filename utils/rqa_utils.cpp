@@ -8,25 +8,354 @@
 #include <stdexcept>
 #include <algorithm>
 #include <numeric>
-#include <map>
 #include <string>
 #include <cstdint>
+#include <cstring>
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
 
 namespace py = pybind11;
 
+// OpenMP pragmas compile away when the extension is built without -fopenmp.
+#ifdef _OPENMP
+#define RQA_OMP(x) _Pragma(#x)
+#else
+#define RQA_OMP(x)
+#endif
+
+// Index of the lowest set bit of a non-zero word.
+static inline int ctz64(uint64_t x) {
+#if defined(_MSC_VER)
+    unsigned long idx;
+    _BitScanForward64(&idx, x);
+    return static_cast<int>(idx);
+#else
+    return __builtin_ctzll(x);
+#endif
+}
+
+// Number of set bits in a word.
+static inline int popcount64(uint64_t x) {
+#if defined(_MSC_VER)
+    return static_cast<int>(__popcnt64(x));
+#else
+    return __builtin_popcountll(x);
+#endif
+}
+
 /************************************
- * rqa_dist
+ * Embedding / distance helpers
  *
- * Compute distances between all points of two vectors,
- * embedded using time lags.
+ * Shared by rqa_dist and the fused rqa_dist_stats path so both
+ * produce bit-identical distances.
  ************************************/
-py::dict rqa_dist(py::array_t<float> a, py::array_t<float> b, int dim, int lag) {
-    auto buf_a = a.request();
-    auto buf_b = b.request();
-    if (buf_a.ndim < 1 || buf_b.ndim < 1)
-        throw std::runtime_error("Input arrays must have at least one dimension.");
+static const int TILE = 64;
 
-    int n = buf_a.shape[0];
+// Embedded vectors in SoA form: component k of vector i is
+// data[k * stride + i], so each component is a contiguous row.
+struct SoAView {
+    const float* data;
+    int stride;
+};
+
+// Time-delay embedding needs no copy: component k of vector i is
+// x[k * lag + i], i.e. component row k is the series shifted by k * lag.
+static SoAView embed_series(const float* x, int lag) {
+    return SoAView{x, lag};
+}
+
+// Distance metrics. METRIC_SQEUCLIDEAN is internal: the Euclidean sum of
+// squares without the sqrt, used when thresholding against rad^2.
+enum DistMetric {
+    METRIC_EUCLIDEAN = 0,
+    METRIC_SQEUCLIDEAN = 1,
+    METRIC_CHEBYSHEV = 2,
+    METRIC_CITYBLOCK = 3,
+    METRIC_COUNT = 4
+};
+
+static int parse_metric(const std::string& metric) {
+    if (metric == "euclidean")
+        return METRIC_EUCLIDEAN;
+    if (metric == "chebyshev")
+        return METRIC_CHEBYSHEV;
+    if (metric == "cityblock")
+        return METRIC_CITYBLOCK;
+    throw std::runtime_error("Unknown metric '" + metric + "' (use 'euclidean', 'chebyshev' or 'cityblock').");
+}
+
+// Distances from one embedded vector ai (dim components) to the SoA
+// vectors b[j0..j1) of emb_b (component stride), written to out[j0..j1).
+//
+// Kernels are templated on the embedding dimension: DIM = 1..MAX_STATIC_DIM
+// are compiled with a fixed trip count (fully unrolled, accumulator kept in
+// a register), DIM = 0 takes dim at run time. Components are always
+// combined in k order (max for Chebyshev is order-free), so every
+// specialization returns the same bits.
+typedef void (*dist_span_fn)(const float* ai, const float* emb_b, int stride, int j0, int j1, int dim, float* out);
+static const int MAX_STATIC_DIM = 8;
+#define RQA_DIM_TABLE(kernel, metric) { kernel<0, metric>, kernel<1, metric>, kernel<2, metric>, \
+                                        kernel<3, metric>, kernel<4, metric>, kernel<5, metric>, \
+                                        kernel<6, metric>, kernel<7, metric>, kernel<8, metric> }
+#define RQA_METRIC_TABLE(kernel) {{ RQA_DIM_TABLE(kernel, METRIC_EUCLIDEAN), \
+                                    RQA_DIM_TABLE(kernel, METRIC_SQEUCLIDEAN), \
+                                    RQA_DIM_TABLE(kernel, METRIC_CHEBYSHEV), \
+                                    RQA_DIM_TABLE(kernel, METRIC_CITYBLOCK) }}
+
+// Kernel tables indexed [metric][dim], filled per ISA.
+struct DistKernels {
+    dist_span_fn fn[METRIC_COUNT][MAX_STATIC_DIM + 1];
+};
+
+// Fold one component difference into the running distance.
+template <int METRIC>
+static inline float dist_accumulate(float acc, float diff) {
+    if (METRIC == METRIC_CHEBYSHEV) {
+        float ad = std::fabs(diff);
+        return (acc > ad) ? acc : ad;   // same NaN handling as maxps
+    }
+    if (METRIC == METRIC_CITYBLOCK)
+        return acc + std::fabs(diff);
+    return acc + diff * diff;
+}
+
+template <int DIM, int METRIC>
+static void dist_span_scalar(const float* ai, const float* emb_b, int stride, int j0, int j1, int dim, float* out) {
+    const int D = DIM ? DIM : dim;
+    if (D == 1) {
+        for (int j = j0; j < j1; j++) {
+            float diff = ai[0] - emb_b[j];
+            out[j] = (METRIC == METRIC_SQEUCLIDEAN) ? diff * diff : std::fabs(diff);
+        }
+    } else if (DIM) {
+        for (int j = j0; j < j1; j++) {
+            float acc = 0.0f;
+            for (int k = 0; k < D; k++)
+                acc = dist_accumulate<METRIC>(acc, ai[k] - emb_b[(size_t)k * stride + j]);
+            out[j] = (METRIC == METRIC_EUCLIDEAN) ? std::sqrt(acc) : acc;
+        }
+    } else {
+        // out doubles as the accumulator; components are combined in k order
+        for (int j = j0; j < j1; j++)
+            out[j] = 0.0f;
+        for (int k = 0; k < D; k++) {
+            const float* bk = emb_b + (size_t)k * stride;
+            float ak = ai[k];
+            for (int j = j0; j < j1; j++)
+                out[j] = dist_accumulate<METRIC>(out[j], ak - bk[j]);
+        }
+        if (METRIC == METRIC_EUCLIDEAN) {
+            for (int j = j0; j < j1; j++)
+                out[j] = std::sqrt(out[j]);
+        }
+    }
+}
+static const DistKernels dist_span_scalar_table = RQA_METRIC_TABLE(dist_span_scalar);
+
+#if (defined(__x86_64__) || defined(__i386__)) && (defined(__GNUC__) || defined(__clang__))
+#define RQA_X86_DISPATCH 1
+#include <immintrin.h>
+
+// SIMD kernels: one lane per column j, contiguous loads from each SoA
+// component row. Squares and sums are kept as separate mul/add (no FMA)
+// so every ISA returns the same bits as the scalar path.
+template <int METRIC>
+__attribute__((target("avx2")))
+static inline __m256 dist_accumulate_avx2(__m256 acc, __m256 diff) {
+    const __m256 signmask = _mm256_set1_ps(-0.0f);
+    if (METRIC == METRIC_CHEBYSHEV)
+        return _mm256_max_ps(acc, _mm256_andnot_ps(signmask, diff));
+    if (METRIC == METRIC_CITYBLOCK)
+        return _mm256_add_ps(acc, _mm256_andnot_ps(signmask, diff));
+    return _mm256_add_ps(acc, _mm256_mul_ps(diff, diff));
+}
+
+template <int DIM, int METRIC>
+__attribute__((target("avx2")))
+static void dist_span_avx2(const float* ai, const float* emb_b, int stride, int j0, int j1, int dim, float* out) {
+    const int D = DIM ? DIM : dim;
+    const __m256 signmask = _mm256_set1_ps(-0.0f);
+    int j = j0;
+    for (; j + 8 <= j1; j += 8) {
+        if (D > 1) {
+            __m256 acc = _mm256_setzero_ps();
+            for (int k = 0; k < D; k++) {
+                __m256 diff = _mm256_sub_ps(_mm256_set1_ps(ai[k]), _mm256_loadu_ps(emb_b + (size_t)k * stride + j));
+                acc = dist_accumulate_avx2<METRIC>(acc, diff);
+            }
+            _mm256_storeu_ps(out + j, (METRIC == METRIC_EUCLIDEAN) ? _mm256_sqrt_ps(acc) : acc);
+        } else {
+            __m256 diff = _mm256_sub_ps(_mm256_set1_ps(ai[0]), _mm256_loadu_ps(emb_b + j));
+            _mm256_storeu_ps(out + j, (METRIC == METRIC_SQEUCLIDEAN) ? _mm256_mul_ps(diff, diff)
+                                                                     : _mm256_andnot_ps(signmask, diff));
+        }
+    }
+    dist_span_scalar<DIM, METRIC>(ai, emb_b, stride, j, j1, dim, out);
+}
+static const DistKernels dist_span_avx2_table = RQA_METRIC_TABLE(dist_span_avx2);
+
+template <int METRIC>
+__attribute__((target("avx512f")))
+static inline __m512 dist_accumulate_avx512(__m512 acc, __m512 diff) {
+    if (METRIC == METRIC_CHEBYSHEV)
+        return _mm512_max_ps(acc, _mm512_abs_ps(diff));
+    if (METRIC == METRIC_CITYBLOCK)
+        return _mm512_add_ps(acc, _mm512_abs_ps(diff));
+    return _mm512_add_ps(acc, _mm512_mul_ps(diff, diff));
+}
+
+template <int DIM, int METRIC>
+__attribute__((target("avx512f")))
+static void dist_span_avx512(const float* ai, const float* emb_b, int stride, int j0, int j1, int dim, float* out) {
+    const int D = DIM ? DIM : dim;
+    int j = j0;
+    for (; j + 16 <= j1; j += 16) {
+        if (D > 1) {
+            __m512 acc = _mm512_setzero_ps();
+            for (int k = 0; k < D; k++) {
+                __m512 diff = _mm512_sub_ps(_mm512_set1_ps(ai[k]), _mm512_loadu_ps(emb_b + (size_t)k * stride + j));
+                acc = dist_accumulate_avx512<METRIC>(acc, diff);
+            }
+            _mm512_storeu_ps(out + j, (METRIC == METRIC_EUCLIDEAN) ? _mm512_sqrt_ps(acc) : acc);
+        } else {
+            __m512 diff = _mm512_sub_ps(_mm512_set1_ps(ai[0]), _mm512_loadu_ps(emb_b + j));
+            _mm512_storeu_ps(out + j, (METRIC == METRIC_SQEUCLIDEAN) ? _mm512_mul_ps(diff, diff)
+                                                                     : _mm512_abs_ps(diff));
+        }
+    }
+    dist_span_scalar<DIM, METRIC>(ai, emb_b, stride, j, j1, dim, out);
+}
+static const DistKernels dist_span_avx512_table = RQA_METRIC_TABLE(dist_span_avx512);
+#endif
+
+// Pick the widest kernel table the running CPU supports (resolved once at load).
+static const DistKernels* resolve_dist_span() {
+#ifdef RQA_X86_DISPATCH
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx512f"))
+        return &dist_span_avx512_table;
+    if (__builtin_cpu_supports("avx2"))
+        return &dist_span_avx2_table;
+#endif
+    return &dist_span_scalar_table;
+}
+static const DistKernels* const dist_span_kernels = resolve_dist_span();
+
+// Kernel for a metric and embedding dimension: the unrolled specialization
+// for dim <= MAX_STATIC_DIM, the run-time dim loop otherwise.
+static inline dist_span_fn dist_span_for(int dim, int metric) {
+    return dist_span_kernels->fn[metric][(dim >= 1 && dim <= MAX_STATIC_DIM) ? dim : 0];
+}
+
+// Largest float t with sqrt(t) <= rad. sqrt is monotonic, so a squared
+// distance s satisfies s <= t exactly when sqrt(s) <= rad, and the
+// threshold can skip the sqrt without changing a single cell.
+static float squared_radius(float rad) {
+    if (std::isinf(rad))
+        return rad;
+    float t = rad * rad;
+    while (std::sqrt(t) > rad)
+        t = std::nextafter(t, 0.0f);
+    while (std::sqrt(std::nextafter(t, INFINITY)) <= rad)
+        t = std::nextafter(t, INFINITY);
+    return t;
+}
+
+// Distances for the tile a[i0..i1) x b[j0..j1); row i is written to
+// out + (i - i0) * nb (columns j0..j1).
+static void dist_block(SoAView emb_a, SoAView emb_b,
+                       int i0, int i1, int j0, int j1, int nb, int dim, int metric, float* out) {
+    dist_span_fn dist_span = dist_span_for(dim, metric);
+    std::vector<float> ai(dim);
+    for (int i = i0; i < i1; i++) {
+        for (int k = 0; k < dim; k++)
+            ai[k] = emb_a.data[(size_t)k * emb_a.stride + i];
+        dist_span(ai.data(), emb_b.data, emb_b.stride, j0, j1, dim, out + (size_t)(i - i0) * nb);
+    }
+}
+
+// Distances from embedded vectors a[i0..i1) to the vectors b[j0..n2)
+// (j0 a multiple of TILE), written row-major into out (row stride n2).
+// Columns are walked in TILE-wide blocks so the b components of a block
+// stay in L1.
+static void dist_rows(SoAView emb_a, SoAView emb_b,
+                      int i0, int i1, int j0, int n2, int dim, int metric, float* out) {
+    int ntiles = (n2 + TILE - 1) / TILE;
+    RQA_OMP(omp parallel for schedule(static))
+    for (int tj = j0 / TILE; tj < ntiles; tj++) {
+        int jj = tj * TILE;
+        dist_block(emb_a, emb_b, i0, i1, jj, std::min(jj + TILE, n2), n2, dim, metric, out);
+    }
+}
+
+// Full na x nb distance matrix (row-major) between the SoA vectors of
+// emb_a and emb_b, parallelised over TILE x TILE blocks. When symmetric
+// (emb_a and emb_b hold the same vectors) only tiles with jj >= ii are
+// computed and then mirrored (|a - b| is exact in either order for
+// every metric, so this is lossless).
+static void dist_matrix(SoAView emb_a, SoAView emb_b,
+                        int na, int nb, int dim, int metric, bool symmetric, float* out) {
+    int ntiles_a = (na + TILE - 1) / TILE;
+    int ntiles_b = (nb + TILE - 1) / TILE;
+    if (!symmetric) {
+        RQA_OMP(omp parallel for schedule(static) collapse(2))
+        for (int ti = 0; ti < ntiles_a; ti++) {
+            for (int tj = 0; tj < ntiles_b; tj++) {
+                int ii = ti * TILE, jj = tj * TILE;
+                dist_block(emb_a, emb_b, ii, std::min(ii + TILE, na), jj, std::min(jj + TILE, nb),
+                           nb, dim, metric, out + (size_t)ii * nb);
+            }
+        }
+    } else {
+        RQA_OMP(omp parallel for schedule(dynamic) collapse(2))
+        for (int ti = 0; ti < ntiles_a; ti++) {
+            for (int tj = 0; tj < ntiles_b; tj++) {
+                if (tj < ti)
+                    continue;
+                int ii = ti * TILE, jj = tj * TILE;
+                int i1 = std::min(ii + TILE, na), j1 = std::min(jj + TILE, nb);
+                dist_block(emb_a, emb_a, ii, i1, jj, j1, nb, dim, metric, out + (size_t)ii * nb);
+                if (tj == ti)
+                    continue;
+                for (int i = ii; i < i1; i++)
+                    for (int j = jj; j < j1; j++)
+                        out[(size_t)j * nb + i] = out[(size_t)i * nb + j];
+            }
+        }
+    }
+}
+
+// SoA view of a (time x dimensions) array. Column-major input (each
+// column contiguous) is used in place; any other strides are copied into
+// storage with component k of point i at storage[k * n + i].
+static SoAView soa_columns(const py::buffer_info& buf, std::vector<float>& storage) {
+    int n = buf.shape[0], dim = buf.shape[1];
+    const char* base = static_cast<const char*>(buf.ptr);
+    if (buf.strides[0] == sizeof(float) && buf.strides[1] > 0 && buf.strides[1] % sizeof(float) == 0)
+        return SoAView{reinterpret_cast<const float*>(base), (int)(buf.strides[1] / sizeof(float))};
+    storage.resize((size_t)n * dim);
+    for (int k = 0; k < dim; k++) {
+        for (int i = 0; i < n; i++) {
+            storage[(size_t)k * n + i] = *reinterpret_cast<const float*>(base + i * buf.strides[0] + k * buf.strides[1]);
+        }
+    }
+    return SoAView{storage.data(), n};
+}
+
+// True when the n vectors of a and b are identical (symmetric matrix).
+static bool same_vectors(SoAView a, SoAView b, int n, int dim) {
+    if (a.data == b.data && a.stride == b.stride)
+        return true;
+    for (int k = 0; k < dim; k++) {
+        if (std::memcmp(a.data + (size_t)k * a.stride, b.data + (size_t)k * b.stride, n * sizeof(float)) != 0)
+            return false;
+    }
+    return true;
+}
+
+// Validate embedding parameters and return the number of embedded vectors.
+static int embedded_length(int n, int dim, int lag) {
     int n2 = n - lag * (dim - 1);
     if (n2 <= 0)
         throw std::runtime_error("Not enough data for these embedding parameters.");
@@ -34,6 +363,28 @@ py::dict rqa_dist(py::array_t<float> a, py::array_t<float> b, int dim, int lag)
         throw std::runtime_error("Time series too short for reliable RQA analysis. Need at least " + 
                                 std::to_string(lag * (dim - 1) + 10) + " data points.");
     }
+    return n2;
+}
+
+/************************************
+ * rqa_dist
+ *
+ * Compute distances between all points of two vectors,
+ * embedded using time lags. metric is "euclidean" (default),
+ * "chebyshev" (max component difference; cheapest, no sqrt) or
+ * "cityblock" (sum of component differences).
+ ************************************/
+py::dict rqa_dist(py::array_t<float, py::array::c_style | py::array::forcecast> a,
+                  py::array_t<float, py::array::c_style | py::array::forcecast> b, int dim, int lag,
+                  std::string metric="euclidean") {
+    int metric_id = parse_metric(metric);
+    auto buf_a = a.request();
+    auto buf_b = b.request();
+    if (buf_a.ndim < 1 || buf_b.ndim < 1)
+        throw std::runtime_error("Input arrays must have at least one dimension.");
+
+    int n = buf_a.shape[0];
+    int n2 = embedded_length(n, dim, lag);
 
     float* ptr_a = static_cast<float*>(buf_a.ptr);
     float* ptr_b = static_cast<float*>(buf_b.ptr);
@@ -42,31 +393,11 @@ py::dict rqa_dist(py::array_t<float> a, py::array_t<float> b, int dim, int lag)
     auto buf_res = result.request();
     float* res_ptr = static_cast<float*>(buf_res.ptr);
 
-    if (dim > 1) {
-        std::vector<float> emb_a(n2 * dim);
-        std::vector<float> emb_b(n2 * dim);
-        for (int k = 0; k < dim; k++) {
-            for (int i = 0; i < n2; i++) {
-                emb_a[i * dim + k] = ptr_a[lag * k + i];
-                emb_b[i * dim + k] = ptr_b[lag * k + i];
-            }
-        }
-        for (int i = 0; i < n2; i++) {
-            for (int j = 0; j < n2; j++) {
-                float sum_sq = 0.0f;
-                for (int k = 0; k < dim; k++) {
-                    float diff = emb_a[i * dim + k] - emb_b[j * dim + k];
-                    sum_sq += diff * diff;
-                }
-                res_ptr[i * n2 + j] = std::sqrt(sum_sq);
-            }
-        }
-    } else {
-        for (int i = 0; i < n2; i++) {
-            for (int j = 0; j < n2; j++) {
-                res_ptr[i * n2 + j] = std::fabs(ptr_a[i] - ptr_b[j]);
-            }
-        }
+    bool symmetric = (ptr_a == ptr_b) ||
+                     (buf_b.shape[0] == n && std::memcmp(ptr_a, ptr_b, n * sizeof(float)) == 0);
+    {
+        py::gil_scoped_release release;
+        dist_matrix(embed_series(ptr_a, lag), embed_series(ptr_b, lag), n2, n2, dim, metric_id, symmetric, res_ptr);
     }
 
     py::dict ds;
@@ -76,6 +407,49 @@ py::dict rqa_dist(py::array_t<float> a, py::array_t<float> b, int dim, int lag)
     return ds;
 }
 
+/************************************
+ * Rescaler
+ *
+ * Distance rescaling applied before thresholding:
+ *   1 = divide by the mean distance, 2 = divide by the max distance,
+ *   anything else leaves distances untouched.
+ ************************************/
+struct Rescaler {
+    int mode = 0;
+    double mean_val = 0.0;
+    float max_val = 0.0f;
+
+    inline float operator()(float v) const {
+        if (mode == 1)
+            return v / mean_val;
+        if (mode == 2)
+            return v / max_val;
+        return v;
+    }
+};
+
+static Rescaler make_rescaler(const float* d, size_t size, int rescale) {
+    Rescaler r;
+    r.mode = rescale;
+    if (rescale == 1)
+        r.mean_val = std::accumulate(d, d + size, 0.0) / size;
+    else if (rescale == 2)
+        r.max_val = *std::max_element(d, d + size);
+    return r;
+}
+
+// Argument checks shared by the thresholding entry points.
+static void check_radius_args(const py::buffer_info& buf, float rad, int diag_ignore) {
+    if (buf.ndim != 2 || buf.shape[0] != buf.shape[1])
+        throw std::runtime_error("Distance matrix must be square");
+    if (buf.size == 1)
+        throw std::runtime_error("Distance matrix has only one element!");
+    if (rad <= 0)
+        throw std::runtime_error("Please use a scalar threshold > 0");
+    if (diag_ignore < 0)
+        throw std::runtime_error("Please use a non-negative integer for diag_ignore");
+}
+
 /************************************
  * rqa_radius
  *
@@ -88,196 +462,319 @@ py::dict rqa_dist(py::array_t<float> a, py::array_t<float> b, int dim, int lag)
  ************************************/
 py::array_t<int8_t> rqa_radius(py::array_t<float> dist, int rescale, float rad, int diag_ignore) {
     auto buf = dist.request();
-    if (buf.ndim != 2 || buf.shape[0] != buf.shape[1])
-        throw std::runtime_error("Distance matrix must be square");
-
+    check_radius_args(buf, rad, diag_ignore);
     int n = buf.shape[0];
-    if (buf.size == 1)
-        throw std::runtime_error("Distance matrix has only one element!");
-    if (rad <= 0)
-        throw std::runtime_error("Please use a scalar threshold > 0");
-    if (diag_ignore < 0)
-        throw std::runtime_error("Please use a non-negative integer for diag_ignore");
 
-    float* dist_ptr = static_cast<float*>(buf.ptr);
-    std::vector<float> scaled(buf.size);
-    for (size_t i = 0; i < buf.size; i++) {
-        scaled[i] = dist_ptr[i];
-    }
-
-    if (rescale == 1) {
-        double sum = std::accumulate(scaled.begin(), scaled.end(), 0.0);
-        double mean_val = sum / scaled.size();
-        for (auto &v : scaled)
-            v = v / mean_val;
-    } else if (rescale == 2) {
-        float max_val = *std::max_element(scaled.begin(), scaled.end());
-        for (auto &v : scaled)
-            v = v / max_val;
-    }
+    // Threshold straight from the float32 distances; no rescaled copy is kept.
+    const float* dist_ptr = static_cast<float*>(buf.ptr);
+    Rescaler scale = make_rescaler(dist_ptr, buf.size, rescale);
 
     auto thrd = py::array_t<int8_t>({n, n});
     auto buf_thrd = thrd.request();
     int8_t* thrd_ptr = static_cast<int8_t*>(buf_thrd.ptr);
-    for (int i = 0; i < n * n; i++) {
-        thrd_ptr[i] = (scaled[i] <= rad) ? 1 : 0;
+    {
+        py::gil_scoped_release release;
+        RQA_OMP(omp parallel for schedule(static))
+        for (int i = 0; i < n; i++) {
+            const float* drow = dist_ptr + (size_t)i * n;
+            int8_t* trow = thrd_ptr + (size_t)i * n;
+            for (int j = 0; j < n; j++)
+                trow[j] = (scale(drow[j]) <= rad) ? 1 : 0;
+            // Zero out the diagonals based on diag_ignore: in row i they are
+            // the contiguous band |i - j| < diag_ignore.
+            if (diag_ignore != 0) {
+                int lo = std::max(0, i - diag_ignore + 1);
+                int hi = std::min(n, i + diag_ignore);
+                if (lo < hi)
+                    std::memset(trow + lo, 0, hi - lo);
+            }
+        }
     }
 
-    // Zero out the diagonals based on diag_ignore.
+    return thrd;
+}
+
+// Threshold distance row i into packed bits (bit j of word j / 64; bits
+// past n stay zero) and clear the Theiler band |i - j| < diag_ignore.
+// Only words w0 onwards are packed (and drow read from column 64 * w0).
+static void pack_threshold_row(const float* drow, int n, int i, const Rescaler& scale, float rad,
+                               int diag_ignore, uint64_t* row, int w0 = 0) {
+    int words = (n + 63) / 64;
+    for (int w = w0; w < words; w++) {
+        int j0 = w * 64;
+        int nb = std::min(64, n - j0);
+        uint64_t word = 0;
+        for (int b = 0; b < nb; b++)
+            word |= (uint64_t)(scale(drow[j0 + b]) <= rad) << b;
+        row[w] = word;
+    }
+    // Clear the band lo..hi-1 a word (mask) at a time.
     if (diag_ignore != 0) {
-        for (int d = 0; d < diag_ignore; d++) {
-            for (int j = 0; j < n - d; j++) {
-                thrd_ptr[j * n + (j + d)] = 0;     // upper diagonal at offset d
-                thrd_ptr[(j + d) * n + j] = 0;       // lower diagonal at offset d
-            }
+        int lo = std::max(0, i - diag_ignore + 1);
+        int hi = std::min(n, i + diag_ignore);
+        for (int w = lo >> 6; lo < hi; w++) {
+            int b0 = lo & 63;
+            int b1 = std::min(64, b0 + (hi - lo));
+            uint64_t mask = (b1 - b0 == 64) ? ~0ULL : (((1ULL << (b1 - b0)) - 1) << b0);
+            row[w] &= ~mask;
+            lo += b1 - b0;
         }
     }
+}
 
-    return thrd;
+/************************************
+ * rqa_radius_packed
+ *
+ * Same thresholding as rqa_radius, but the recurrence matrix is returned
+ * bit-packed: row i is (n + 63) / 64 uint64 words and column j is bit
+ * (j % 64) of word (j / 64). This is 8x smaller than the int8 matrix.
+ ************************************/
+py::array_t<uint64_t> rqa_radius_packed(py::array_t<float> dist, int rescale, float rad, int diag_ignore) {
+    auto buf = dist.request();
+    check_radius_args(buf, rad, diag_ignore);
+    int n = buf.shape[0];
+
+    const float* dist_ptr = static_cast<float*>(buf.ptr);
+    Rescaler scale = make_rescaler(dist_ptr, buf.size, rescale);
+
+    int words = (n + 63) / 64;
+    auto bits = py::array_t<uint64_t>({n, words});
+    uint64_t* bits_ptr = static_cast<uint64_t*>(bits.request().ptr);
+    py::gil_scoped_release release;
+    RQA_OMP(omp parallel for schedule(static))
+    for (int i = 0; i < n; i++)
+        pack_threshold_row(dist_ptr + (size_t)i * n, n, i, scale, rad, diag_ignore,
+                           bits_ptr + (size_t)i * words);
+    return bits;
 }
 
 /************************************
- * rqa_line
+ * diag_trends
  *
- * Find all diagonal lines (and compute trend measures)
- * in a thresholded matrix.
- * diag_ignore specifies the number of diagonals to ignore.
+ * Least-squares slope (x1000) of the per-diagonal recurrence density
+ * moving away from the main diagonal, for the lower and upper triangle.
+ * diag_pts holds the recurrent points of each of the 2 * n - 1 diagonals
+ * (index n - 1 is the main diagonal); the diagonal at offset x has n - x
+ * cells, so densities are formed on the fly rather than in a copy. The
+ * regression sums are accumulated in one running pass per triangle.
  ************************************/
-py::tuple rqa_line(py::array_t<int8_t> thrd, int diag_ignore) {
-    auto buf = thrd.request();
-    if (buf.ndim != 2 || buf.shape[0] != buf.shape[1])
-        throw std::runtime_error("Thresholded distance matrix must be square");
+static double density_trend(const std::vector<float>& diag_pts, int n, int start, int step, int x0, int count) {
+    if (count < 2)
+        return 0.0;
+    double sum_x = 0.0, sum_y = 0.0, sum_xx = 0.0, sum_xy = 0.0;
+    for (int i = 0; i < count; i++) {
+        double x = x0 + i;
+        float density = diag_pts[start + step * i] / (float)(n - (x0 + i));
+        double y = 100.0 * density;
+        sum_x += x;
+        sum_y += y;
+        sum_xx += x * x;
+        sum_xy += x * y;
+    }
+    double denom = count * sum_xx - sum_x * sum_x;
+    return (denom != 0) ? 1000 * ((count * sum_xy - sum_x * sum_y) / denom) : 0.0;
+}
 
-    int n = buf.shape[0];
-    std::vector<short> ll;
-    ll.reserve(n * n);
-    int diagCount = 2 * n - 1;
-    std::vector<std::vector<float>> recur(diagCount, std::vector<float>(2, 0.0f));
-    int nlines = 0;
-    int8_t* data = static_cast<int8_t*>(buf.ptr);
-
-    for (int i = 0; i < diagCount; i++) {
-        int offset = i - n + 1;
-        int ld = n - std::abs(offset);
-        recur[i][0] = ld;
-        int j = 0;
-        while (j < ld) {
-            int row, col;
-            if (offset >= 0) {
-                row = j;
-                col = j + offset;
-            } else {
-                row = j - offset;
-                col = j;
-            }
-            int index = row * n + col;
-            if (data[index] == 1) {
-                ll.push_back(1);
-                nlines = ll.size();
-                recur[i][1] += 1;
-                int k = j + 1;
-                while (k < ld) {
-                    int r, c;
-                    if (offset >= 0) {
-                        r = k;
-                        c = k + offset;
-                    } else {
-                        r = k - offset;
-                        c = k;
+static void diag_trends(const std::vector<float>& diag_pts, int n, int diag_ignore,
+                        double& trend1, double& trend2) {
+    int mid = n - 1;
+    int count = std::max(0, n - diag_ignore);   // diagonals at offsets diag_ignore .. n - 1
+    trend1 = density_trend(diag_pts, n, mid - diag_ignore, -1, diag_ignore, count);
+    trend2 = density_trend(diag_pts, n, mid + diag_ignore, 1, diag_ignore, count);
+}
+
+// Number of points left in an n x n matrix once diag_ignore diagonals are removed.
+static long long theiler_npts(int n, int diag_ignore) {
+    long long nn = n;
+    return (diag_ignore == 0) ? nn * nn : nn * nn - nn - 2 * nn * (diag_ignore - 1) + (long long)diag_ignore * (diag_ignore - 1);
+}
+
+/************************************
+ * LineScanner
+ *
+ * Single-pass, row-major scanner for a bit-packed thresholded matrix. It
+ * keeps the open run length of every diagonal and every column, so
+ * diagonal lines, vertical lines and per-diagonal recurrence counts are
+ * collected while each row is visited exactly once (and never needs to
+ * be kept).
+ ************************************/
+struct LineScanner {
+    int n;
+    int vmin;
+    int words;                      // uint64 words per packed row
+    uint64_t last_mask;             // valid bits of the last word
+    std::vector<int> diag_run;      // open run per diagonal, index j - i + n - 1
+    std::vector<int> vert_run;      // open run per column
+    std::vector<float> diag_pts;    // recurrent points per diagonal
+    std::vector<uint64_t> prev;     // previous packed row
+    std::vector<int32_t> ll;        // diagonal line lengths
+    long long recur = 0;            // recurrent points (= sum of ll)
+    std::vector<int> vert_lengths;  // vertical lines with length >= vmin
+    double vertical_sum_valid = 0.0;
+    double vertical_total = 0.0;
+    int count_valid = 0;
+    int Vmax = 0;
+
+    LineScanner(int n_, int vmin_)
+        : n(n_), vmin(vmin_), words((n_ + 63) / 64),
+          last_mask((n_ % 64) ? (1ULL << (n_ % 64)) - 1 : ~0ULL),
+          diag_run(2 * n_ - 1, 0), vert_run(n_, 0), diag_pts(2 * n_ - 1, 0.0f), prev(words, 0) {}
+
+    void close_vertical(int count) {
+        vertical_total += count;
+        if (count >= vmin) {
+            vert_lengths.push_back(count);
+            vertical_sum_valid += count;
+            count_valid++;
+            if (count > Vmax) Vmax = count;
+        }
+    }
+
+    // Row i as packed bits (rqa_radius_packed layout). Only columns where
+    // a run can change are visited: set cells, plus cleared cells that end
+    // a vertical run (set in prev) or a diagonal run (set in prev << 1).
+    // Events are taken in increasing j, so lines come out in column order.
+    void push_row(int i, const uint64_t* row) {
+        int* run = &diag_run[n - 1 - i];    // run[j] is the diagonal through (i, j)
+        float* pts = &diag_pts[n - 1 - i];
+        uint64_t carry = 0;
+        for (int w = 0; w < words; w++) {
+            uint64_t cur = row[w];
+            uint64_t prv = prev[w];
+            uint64_t events = cur | prv | (prv << 1) | carry;
+            carry = prv >> 63;
+            if (w == words - 1)
+                events &= last_mask;
+            prev[w] = cur;
+            recur += popcount64(cur);
+            while (events) {
+                int b = ctz64(events);
+                events &= events - 1;
+                int j = w * 64 + b;
+                if ((cur >> b) & 1) {
+                    run[j]++;
+                    pts[j] += 1.0f;
+                    vert_run[j]++;
+                } else {
+                    if (run[j] > 0) {
+                        ll.push_back(static_cast<int32_t>(run[j]));
+                        run[j] = 0;
                     }
-                    int idx = r * n + c;
-                    if (data[idx] == 1) {
-                        ll.back() += 1;
-                        recur[i][1] += 1;
-                        k++;
-                    } else {
-                        break;
+                    if (vert_run[j] > 0) {
+                        close_vertical(vert_run[j]);
+                        vert_run[j] = 0;
                     }
                 }
-                j = k;
-            } else {
-                j++;
             }
         }
-    }
-    // ll already has correct size from dynamic allocation
-
-    int mid = 0;
-    float max_val = recur[0][0];
-    for (int i = 1; i < diagCount; i++) {
-        if (recur[i][0] > max_val) {
-            max_val = recur[i][0];
-            mid = i;
+        // The diagonal through the last column cannot continue.
+        if (run[n - 1] > 0) {
+            ll.push_back(static_cast<int32_t>(run[n - 1]));
+            run[n - 1] = 0;
         }
     }
-    for (int i = 0; i < diagCount; i++) {
-        if (recur[i][0] != 0)
-            recur[i][1] = recur[i][1] / recur[i][0];
-    }
-
-    // Compute lower diagonal trend
-    int first = diag_ignore;
-    int last = n - 1;
-    int len_range = last - first + 1;
-    std::vector<double> x_lower, y_lower;
-    for (int i = 0; i < len_range; i++) {
-        x_lower.push_back(first + i);
-        int idx = mid - diag_ignore - i;
-        if (idx < 0)
-            break;
-        y_lower.push_back(100.0 * recur[idx][1]);
-    }
-    double trend1 = 0.0;
-    if (y_lower.size() >= 2) {
-        double sum_x = std::accumulate(x_lower.begin(), x_lower.end(), 0.0);
-        double sum_y = std::accumulate(y_lower.begin(), y_lower.end(), 0.0);
-        double sum_xx = 0.0, sum_xy = 0.0;
-        int valid_count = y_lower.size();
-        for (size_t i = 0; i < valid_count; i++) {
-            sum_xx += x_lower[i] * x_lower[i];
-            sum_xy += x_lower[i] * y_lower[i];
+
+    void finish() {
+        for (auto& r : diag_run) {
+            if (r > 0) {
+                ll.push_back(static_cast<int32_t>(r));
+                r = 0;
+            }
         }
-        double denom = valid_count * sum_xx - sum_x * sum_x;
-        if (denom != 0)
-            trend1 = 1000 * ((valid_count * sum_xy - sum_x * sum_y) / denom);
-    }
-
-    // Compute upper diagonal trend
-    int first_up = mid + diag_ignore;
-    int last_up = 2 * n - 2;
-    int len_range_up = last_up - first_up + 1;
-    std::vector<double> x_upper, y_upper;
-    for (int i = 0; i < len_range_up; i++) {
-        x_upper.push_back(diag_ignore + i);
-        if (first_up + i >= diagCount)
-            break;
-        y_upper.push_back(100.0 * recur[first_up + i][1]);
-    }
-    double trend2 = 0.0;
-    if (y_upper.size() >= 2) {
-        double sum_x = std::accumulate(x_upper.begin(), x_upper.end(), 0.0);
-        double sum_y = std::accumulate(y_upper.begin(), y_upper.end(), 0.0);
-        double sum_xx = 0.0, sum_xy = 0.0;
-        int valid_count = y_upper.size();
-        for (size_t i = 0; i < valid_count; i++) {
-            sum_xx += x_upper[i] * x_upper[i];
-            sum_xy += x_upper[i] * y_upper[i];
+        for (auto& v : vert_run) {
+            if (v > 0) {
+                close_vertical(v);
+                v = 0;
+            }
         }
-        double denom = valid_count * sum_xx - sum_x * sum_x;
-        if (denom != 0)
-            trend2 = 1000 * ((valid_count * sum_xy - sum_x * sum_y) / denom);
     }
 
-    int maxl_poss = n - diag_ignore;
-    int npts = (diag_ignore == 0) ? n * n : n * n - n - 2 * n * (diag_ignore - 1) + diag_ignore * (diag_ignore - 1);
+    py::tuple vertical_result() const {
+        double laminarity = (vertical_total > 0) ? vertical_sum_valid / vertical_total : 0.0;
+        double trapping_time = (count_valid > 0) ? vertical_sum_valid / count_valid : 0.0;
+        auto result = py::array_t<int>(vert_lengths.size());
+        std::copy(vert_lengths.begin(), vert_lengths.end(), static_cast<int*>(result.request().ptr));
+        return py::make_tuple(result, laminarity, trapping_time, Vmax);
+    }
+
+    py::array_t<int32_t> line_lengths() const {
+        auto result = py::array_t<int32_t>(ll.size());
+        std::copy(ll.begin(), ll.end(), static_cast<int32_t*>(result.request().ptr));
+        return result;
+    }
+};
+
+// Pack an int8 thresholded row (cells equal to 1) into bits.
+static void pack_int8_row(const int8_t* trow, int n, uint64_t* row) {
+    int words = (n + 63) / 64;
+    for (int w = 0; w < words; w++) {
+        int j0 = w * 64;
+        int nb = std::min(64, n - j0);
+        uint64_t word = 0;
+        for (int b = 0; b < nb; b++)
+            word |= (uint64_t)(trow[j0 + b] == 1) << b;
+        row[w] = word;
+    }
+}
+
+// Feed an int8 thresholded matrix through a LineScanner, packing TILE
+// rows at a time.
+static void scan_thresholded(const int8_t* data, int n, LineScanner& scanner) {
+    int words = (n + 63) / 64;
+    std::vector<uint64_t> bits((size_t)TILE * words);
+    for (int i0 = 0; i0 < n; i0 += TILE) {
+        int i1 = std::min(i0 + TILE, n);
+        RQA_OMP(omp parallel for schedule(static))
+        for (int i = i0; i < i1; i++)
+            pack_int8_row(data + (size_t)i * n, n, &bits[(size_t)(i - i0) * words]);
+        for (int i = i0; i < i1; i++)
+            scanner.push_row(i, &bits[(size_t)(i - i0) * words]);
+    }
+    scanner.finish();
+}
 
-    auto ll_array = py::array_t<short>(ll.size());
-    auto buf_ll = ll_array.request();
-    short* ll_ptr = static_cast<short*>(buf_ll.ptr);
-    for (size_t i = 0; i < ll.size(); i++)
-        ll_ptr[i] = ll[i];
+// Threshold a distance matrix straight into a LineScanner (same result
+// as rqa_radius + scan_thresholded, without the int8 matrix).
+static void scan_distances(const float* dist, int n, const Rescaler& scale, float rad,
+                           int diag_ignore, LineScanner& scanner) {
+    int words = (n + 63) / 64;
+    std::vector<uint64_t> bits((size_t)TILE * words);
+    for (int i0 = 0; i0 < n; i0 += TILE) {
+        int i1 = std::min(i0 + TILE, n);
+        RQA_OMP(omp parallel for schedule(static))
+        for (int i = i0; i < i1; i++)
+            pack_threshold_row(dist + (size_t)i * n, n, i, scale, rad, diag_ignore,
+                               &bits[(size_t)(i - i0) * words]);
+        for (int i = i0; i < i1; i++)
+            scanner.push_row(i, &bits[(size_t)(i - i0) * words]);
+    }
+    scanner.finish();
+}
 
-    return py::make_tuple(ll_array, maxl_poss, npts, trend1, trend2);
+/************************************
+ * rqa_line
+ *
+ * Find all diagonal lines (and compute trend measures)
+ * in a thresholded matrix, in one row-major LineScanner pass.
+ * diag_ignore specifies the number of diagonals to ignore.
+ ************************************/
+py::tuple rqa_line(py::array_t<int8_t> thrd, int diag_ignore) {
+    auto buf = thrd.request();
+    if (buf.ndim != 2 || buf.shape[0] != buf.shape[1])
+        throw std::runtime_error("Thresholded distance matrix must be square");
+
+    int n = buf.shape[0];
+    LineScanner scanner(n, 1);
+    {
+        py::gil_scoped_release release;
+        scan_thresholded(static_cast<int8_t*>(buf.ptr), n, scanner);
+    }
+    double trend1, trend2;
+    diag_trends(scanner.diag_pts, n, diag_ignore, trend1, trend2);
+
+    int maxl_poss = n - diag_ignore;
+    long long npts = theiler_npts(n, diag_ignore);
+    return py::make_tuple(scanner.line_lengths(), maxl_poss, npts, trend1, trend2);
 }
 
 /************************************
@@ -285,22 +782,32 @@ py::tuple rqa_line(py::array_t<int8_t> thrd, int diag_ignore) {
  *
  * Compute the histogram of line lengths and basic statistics.
  ************************************/
-py::tuple rqa_histlines(py::array_t<short> llengths, int minl) {
+py::tuple rqa_histlines(py::array_t<int32_t> llengths, int minl) {
     auto buf = llengths.request();
     if (buf.ndim != 1)
         throw std::runtime_error("Input data must be a vector, not a matrix");
     if (minl <= 0)
         throw std::runtime_error("Please use an integer min line length >= 1");
 
-    short* data = static_cast<short*>(buf.ptr);
+    int32_t* data = static_cast<int32_t*>(buf.ptr);
     size_t size = buf.shape[0];
 
-    std::vector<short> valid;
+    // Line lengths are bounded by n, so a counting vector replaces the
+    // sort/map: counts[l] is the number of lines of length l >= minl.
+    int max_len = 0;
+    for (size_t i = 0; i < size; i++)
+        max_len = std::max(max_len, data[i]);
+    std::vector<int> counts(max_len + 1, 0);
+    int count = 0;
+    double sum = 0.0;
     for (size_t i = 0; i < size; i++) {
-        if (data[i] >= minl)
-            valid.push_back(data[i]);
+        if (data[i] >= minl) {
+            counts[data[i]]++;
+            count++;
+            sum += data[i];
+        }
     }
-    if (valid.empty()) {
+    if (count == 0) {
         auto linehist = py::array_t<float>({1, 2});
         auto buf_hist = linehist.request();
         float* hist_ptr = static_cast<float*>(buf_hist.ptr);
@@ -313,30 +820,32 @@ py::tuple rqa_histlines(py::array_t<short> llengths, int minl) {
         return py::make_tuple(linehist, linestats);
     }
 
-    double sum = std::accumulate(valid.begin(), valid.end(), 0.0);
-    double mean_val = sum / valid.size();
+    // Mean and std from the histogram rather than from every line
+    double mean_val = sum / count;
     double sq_sum = 0.0;
-    for (auto v : valid)
-        sq_sum += (v - mean_val) * (v - mean_val);
-    double std_val = std::sqrt(sq_sum / valid.size());
-    int count = valid.size();
+    size_t num_unique = 0;
+    for (int l = minl; l <= max_len; l++) {
+        if (counts[l] > 0) {
+            sq_sum += counts[l] * (l - mean_val) * (l - mean_val);
+            num_unique++;
+        }
+    }
+    double std_val = std::sqrt(sq_sum / count);
     py::list linestats;
     linestats.append(mean_val);
     linestats.append(std_val);
     linestats.append(count);
 
-    std::map<short, int> freq;
-    for (auto v : valid)
-        freq[v]++;
-    size_t num_unique = freq.size();
     auto linehist = py::array_t<float>({(int)num_unique, 2});
     auto buf_hist = linehist.request();
     float* hist_ptr = static_cast<float*>(buf_hist.ptr);
     size_t idx = 0;
-    for (auto& kv : freq) {
-        hist_ptr[idx * 2]     = kv.first;
-        hist_ptr[idx * 2 + 1] = kv.second;
-        idx++;
+    for (int l = minl; l <= max_len; l++) {
+        if (counts[l] > 0) {
+            hist_ptr[idx * 2]     = l;
+            hist_ptr[idx * 2 + 1] = counts[l];
+            idx++;
+        }
     }
     return py::make_tuple(linehist, linestats);
 }
@@ -353,21 +862,24 @@ py::list rqa_entropy(py::array_t<float> distr, int nstates) {
     if (nstates <= 0)
         throw std::runtime_error("Please use an integer greater than 0 for the number of states");
 
+    // One pass over the counts c: with S = sum(c),
+    // H = -sum((c / S) * ln(c / S)) = ln(S) - sum(c * ln(c)) / S,
+    // converted to bits once at the end (c = 0 terms contribute nothing).
     float* data = static_cast<float*>(buf.ptr);
     size_t size = buf.shape[0];
-    double sum_val = 0.0;
-    for (size_t i = 0; i < size; i++)
-        sum_val += data[i];
+    double sum_val = 0.0, sum_clogc = 0.0;
+    for (size_t i = 0; i < size; i++) {
+        double c = data[i];
+        sum_val += c;
+        if (c > 0)
+            sum_clogc += c * std::log(c);
+    }
     if (sum_val == 0.0)
         throw std::runtime_error("Sum of the distribution is zero; invalid input.");
 
-    double shannon_entropy = 0.0;
-    for (size_t i = 0; i < size; i++) {
-        double p = data[i] / sum_val;
-        if (p > 0)
-            shannon_entropy -= p * std::log(p) / std::log(2.0);
-    }
-    double max_entropy = std::log(nstates) / std::log(2.0);
+    const double inv_ln2 = 1.0 / std::log(2.0);
+    double shannon_entropy = (std::log(sum_val) - sum_clogc / sum_val) * inv_ln2;
+    double max_entropy = std::log(nstates) * inv_ln2;
     double remaining_info = max_entropy - shannon_entropy;
     py::list result;
     result.append(shannon_entropy);
@@ -379,7 +891,10 @@ py::list rqa_entropy(py::array_t<float> distr, int nstates) {
  * rqa_vertical
  *
  * Compute vertical line metrics.
- * Iterates over each column of the threshold matrix.
+ * Walks the threshold matrix row by row through a LineScanner (open runs
+ * are kept per column), so the matrix is read sequentially instead of
+ * with a stride of n per column. Vertical line lengths come out in the
+ * order the lines close.
  * Returns a tuple:
  *   (vertical_line_lengths, laminarity, trapping_time, Vmax)
  *
@@ -393,84 +908,28 @@ py::tuple rqa_vertical(py::array_t<int8_t> thrd, int vmin) {
     if (buf.ndim != 2 || buf.shape[0] != buf.shape[1])
          throw std::runtime_error("Thresholded matrix must be square");
     int n = buf.shape[0];
-    int8_t* data = static_cast<int8_t*>(buf.ptr);
-    std::vector<int> vert_lengths; // vertical lines with length >= vmin
-    double vertical_sum_valid = 0.0; // sum of lengths for vertical lines >= vmin
-    double vertical_total = 0.0;     // sum of lengths for all vertical segments (length>=1)
-    int count_valid = 0;
-    int Vmax = 0;
-    for (int j = 0; j < n; j++) {
-         int count = 0;
-         for (int i = 0; i < n; i++) {
-             int idx = i * n + j;
-             if (data[idx] == 1) {
-                 count++;
-             } else {
-                 if (count > 0) {
-                     vertical_total += count;
-                     if (count >= vmin) {
-                         vert_lengths.push_back(count);
-                         vertical_sum_valid += count;
-                         count_valid++;
-                         if (count > Vmax) Vmax = count;
-                     }
-                     count = 0;
-                 }
-             }
-         }
-         if (count > 0) {
-             vertical_total += count;
-             if (count >= vmin) {
-                 vert_lengths.push_back(count);
-                 vertical_sum_valid += count;
-                 count_valid++;
-                 if (count > Vmax) Vmax = count;
-             }
-         }
-    }
-    double laminarity = (vertical_total > 0) ? vertical_sum_valid / vertical_total : 0.0;
-    double trapping_time = (count_valid > 0) ? vertical_sum_valid / count_valid : 0.0;
-    auto result = py::array_t<int>(vert_lengths.size());
-    auto buf_res = result.request();
-    int* res_ptr = static_cast<int*>(buf_res.ptr);
-    for (size_t i = 0; i < vert_lengths.size(); i++) {
-         res_ptr[i] = vert_lengths[i];
+    LineScanner scanner(n, vmin);
+    {
+        py::gil_scoped_release release;
+        scan_thresholded(static_cast<int8_t*>(buf.ptr), n, scanner);
     }
-    return py::make_tuple(result, laminarity, trapping_time, Vmax);
+    return scanner.vertical_result();
 }
 
 /************************************
- * rqa_stats
- *
- * Perform full Recurrence Quantification Analysis (RQA) on a distance matrix.
+ * summarize_rqa
  *
- * Parameters:
- *   - rqa_mode: "auto" or "cross". For "auto", diag_ignore is used;
- *               for "cross", no diagonals are ignored.
- *
- * Additional vertical metrics (LAM, TT, Vmax) and divergence (1/Lmax) are added.
+ * Assemble the (td, rs, mats, err_code) tuple returned by rqa_stats and
+ * rqa_dist_stats from the diagonal line lengths, recurrence count, trends
+ * and vertical line metrics of a thresholded matrix. With return_matrices
+ * false, td and mats are returned as None.
  ************************************/
-py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignore, int minl, std::string rqa_mode="auto") {
+static py::tuple summarize_rqa(py::object td, py::array_t<int32_t> ll, long long recur_sum,
+                               int maxl_poss, long long npts,
+                               double trend1, double trend2, py::tuple vert_result,
+                               int rescale, float rad, int diag_ignore, int minl,
+                               bool return_matrices) {
     int err_code = 0;
-    // For cross recurrence, ignore no diagonals.
-    if (rqa_mode == "cross")
-        diag_ignore = 0;
-
-    py::array_t<int8_t> td;
-    try {
-        td = rqa_radius(d, rescale, rad, diag_ignore);
-    } catch (std::runtime_error &e) {
-        throw std::runtime_error("Error in thresholding: " + std::string(e.what()));
-        err_code = 1;
-        return py::make_tuple(py::none(), py::none(), py::none(), err_code);
-    }
-    py::tuple line_result = rqa_line(td, diag_ignore);
-    py::array ll = line_result[0].cast<py::array>();
-    int maxl_poss = line_result[1].cast<int>();
-    int npts = line_result[2].cast<int>();
-    double trend1 = line_result[3].cast<double>();
-    double trend2 = line_result[4].cast<double>();
-
     if (ll.request().size == 0) {
         err_code = 2;
         py::dict empty_rs;
@@ -494,6 +953,8 @@ py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignor
         empty_rs["trapping_time"] = 0.0;
         empty_rs["vmax"] = 0;
         empty_rs["divergence"] = 0.0;
+        if (!return_matrices)
+            return py::make_tuple(py::none(), empty_rs, py::none(), err_code);
         
         py::dict empty_mats;
         empty_mats["rescale"] = rescale;
@@ -501,8 +962,10 @@ py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignor
         empty_mats["diag_ignore"] = diag_ignore;
         empty_mats["minl"] = minl;
         empty_mats["td"] = td;
-        empty_mats["ll"] = py::array_t<short>(0);
-        empty_mats["lh"] = py::array_t<float>({1, 2});
+        empty_mats["ll"] = py::array_t<int32_t>(0);
+        auto empty_lh = py::array_t<float>({1, 2});
+        std::fill_n(static_cast<float*>(empty_lh.request().ptr), 2, 0.0f);
+        empty_mats["lh"] = empty_lh;
         empty_mats["vertical"] = py::array_t<int>(0);
         
         return py::make_tuple(td, empty_rs, empty_mats, err_code);
@@ -533,11 +996,6 @@ py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignor
         entropy.append(0.0);
     }
 
-    auto buf_ll = ll.request();
-    short* ll_ptr = static_cast<short*>(buf_ll.ptr);
-    long long recur_sum = 0;
-    for (size_t i = 0; i < buf_ll.size; i++)
-        recur_sum += ll_ptr[i];
     double perc_rec = 100.0 * recur_sum / npts;
     double perc_determ = 0.0;
     double maxl_found = 0.0;
@@ -555,8 +1013,7 @@ py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignor
         perc_determ = 100.0 * sum_det / recur_sum;
     }
     
-    // Compute vertical line metrics
-    py::tuple vert_result = rqa_vertical(td, minl);
+    // Vertical line metrics
     py::array vert_lines = vert_result[0].cast<py::array>();
     double laminarity = vert_result[1].cast<double>();
     double trapping_time = vert_result[2].cast<double>();
@@ -586,6 +1043,8 @@ py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignor
     rs["trapping_time"] = trapping_time;
     rs["vmax"]          = Vmax;
     rs["divergence"]    = divergence;
+    if (!return_matrices)
+        return py::make_tuple(py::none(), rs, py::none(), err_code);
 
     py::dict mats;
     mats["rescale"]     = rescale;
@@ -600,13 +1059,235 @@ py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignor
     return py::make_tuple(td, rs, mats, err_code);
 }
 
+
+/************************************
+ * rqa_stats
+ *
+ * Perform full Recurrence Quantification Analysis (RQA) on a distance matrix.
+ *
+ * Parameters:
+ *   - rqa_mode: "auto" or "cross". For "auto", diag_ignore is used;
+ *               for "cross", no diagonals are ignored.
+ *
+ * Additional vertical metrics (LAM, TT, Vmax) and divergence (1/Lmax) are added.
+ * return_matrices=false returns None for td and mats (only rs is built).
+ ************************************/
+py::tuple rqa_stats(py::array_t<float> d, int rescale, float rad, int diag_ignore, int minl,
+                    std::string rqa_mode="auto", bool return_matrices=true) {
+    int err_code = 0;
+    // For cross recurrence, ignore no diagonals.
+    if (rqa_mode == "cross")
+        diag_ignore = 0;
+
+    // Lines, vertical lines and diagonal densities come from a single
+    // LineScanner pass; the int8 td is only built when it is returned.
+    auto buf = d.request();
+    try {
+        check_radius_args(buf, rad, diag_ignore);
+    } catch (std::runtime_error &e) {
+        throw std::runtime_error("Error in thresholding: " + std::string(e.what()));
+        err_code = 1;
+        return py::make_tuple(py::none(), py::none(), py::none(), err_code);
+    }
+    int n = buf.shape[0];
+    py::object td = py::none();
+    LineScanner scanner(n, minl);
+    if (return_matrices) {
+        py::array_t<int8_t> thrd = rqa_radius(d, rescale, rad, diag_ignore);
+        td = thrd;
+        const int8_t* thrd_ptr = static_cast<int8_t*>(thrd.request().ptr);
+        py::gil_scoped_release release;
+        scan_thresholded(thrd_ptr, n, scanner);
+    } else {
+        const float* dist_ptr = static_cast<float*>(buf.ptr);
+        py::gil_scoped_release release;
+        Rescaler scale = make_rescaler(dist_ptr, buf.size, rescale);
+        scan_distances(dist_ptr, n, scale, rad, diag_ignore, scanner);
+    }
+    double trend1, trend2;
+    diag_trends(scanner.diag_pts, n, diag_ignore, trend1, trend2);
+    py::array ll = scanner.line_lengths();
+    int maxl_poss = n - diag_ignore;
+    long long npts = theiler_npts(n, diag_ignore);
+    py::tuple vert_result = scanner.vertical_result();
+
+    return summarize_rqa(td, ll, scanner.recur, maxl_poss, npts, trend1, trend2, vert_result,
+                         rescale, rad, diag_ignore, minl, return_matrices);
+}
+
+// In-place transpose of a 64 x 64 bit block (bit c of a[r] is cell (r, c)).
+static void transpose64(uint64_t* a) {
+    uint64_t m = 0x00000000FFFFFFFFULL;
+    for (int j = 32; j != 0; j >>= 1, m ^= (m << j)) {
+        for (int k = 0; k < 64; k = ((k | j) + 1) & ~j) {
+            uint64_t t = ((a[k] >> j) ^ a[k | j]) & m;
+            a[k] ^= t << j;
+            a[k | j] ^= t;
+        }
+    }
+}
+
+/************************************
+ * fused_scan
+ *
+ * Distance + threshold + line scan for SoA vectors emb_a x emb_b (n2 each).
+ * Distances are computed strip by strip (TILE rows at a time), rescaled,
+ * thresholded and fed straight into the LineScanner, so the N x N
+ * distance matrix is never materialised. Mean/max rescaling needs one
+ * extra distance pass to find the global scale factor. td_ptr, when not
+ * null, receives the int8 thresholded matrix. Runs without the GIL.
+ *
+ * When symmetric (emb_a and emb_b hold the same vectors, i.e. auto-RQA)
+ * only the tiles on and above the diagonal are computed: the words left
+ * of the diagonal block of each packed row are 64 x 64 transposes of rows
+ * already scanned, which are kept (n2 x n2 bits) for that purpose.
+ ************************************/
+static void fused_scan(SoAView emb_a, SoAView emb_b, int n2, int dim, bool symmetric,
+                       int metric, int rescale, float rad, int diag_ignore, int8_t* td_ptr, LineScanner& scanner) {
+    std::vector<float> strip((size_t)TILE * n2);
+
+    // Global rescale factor (summed serially so the result does not
+    // depend on the thread count)
+    Rescaler scale;
+    scale.mode = rescale;
+    if (rescale == 1 || rescale == 2) {
+        double sum = 0.0, sum_off = 0.0;    // sum_off: tiles right of the diagonal block, counted twice
+        for (int i0 = 0; i0 < n2; i0 += TILE) {
+            int i1 = std::min(i0 + TILE, n2);
+            int j0 = symmetric ? i0 : 0;
+            dist_rows(emb_a, emb_b, i0, i1, j0, n2, dim, metric, strip.data());
+            int jmid = symmetric ? i1 : n2;
+            for (int i = 0; i < i1 - i0; i++) {
+                const float* srow = &strip[(size_t)i * n2];
+                for (int j = j0; j < n2; j++) {
+                    if (j < jmid)
+                        sum += srow[j];
+                    else
+                        sum_off += srow[j];
+                    if (srow[j] > scale.max_val) scale.max_val = srow[j];
+                }
+            }
+        }
+        scale.mean_val = (sum + 2.0 * sum_off) / ((double)n2 * n2);
+    }
+
+    // Without rescaling, squared Euclidean distances are compared against
+    // the squared radius, which selects the same cells (see squared_radius).
+    // dim == 1 distances (and the other metrics) need no sqrt in the first place.
+    bool squared = metric == METRIC_EUCLIDEAN && (rescale != 1 && rescale != 2) && dim > 1;
+    float thresh = squared ? squared_radius(rad) : rad;
+    int scan_metric = squared ? METRIC_SQEUCLIDEAN : metric;
+
+    int words = (n2 + 63) / 64;
+    // Symmetric scans keep every packed row; otherwise one strip is enough.
+    std::vector<uint64_t> bits((size_t)(symmetric ? n2 : TILE) * words);
+    for (int i0 = 0; i0 < n2; i0 += TILE) {
+        int i1 = std::min(i0 + TILE, n2);
+        int w0 = symmetric ? i0 / 64 : 0;   // TILE == 64, so strips are word aligned
+        uint64_t* strip_bits = &bits[(size_t)(symmetric ? i0 : 0) * words];
+        dist_rows(emb_a, emb_b, i0, i1, 64 * w0, n2, dim, scan_metric, strip.data());
+        RQA_OMP(omp parallel for schedule(static))
+        for (int i = i0; i < i1; i++)
+            pack_threshold_row(&strip[(size_t)(i - i0) * n2], n2, i, scale, thresh, diag_ignore,
+                               &strip_bits[(size_t)(i - i0) * words], w0);
+        if (symmetric) {
+            // Word w < w0 of these rows = transpose of word w0 of rows 64w..64w+63
+            RQA_OMP(omp parallel for schedule(static))
+            for (int w = 0; w < w0; w++) {
+                uint64_t block[64];
+                for (int r = 0; r < 64; r++)
+                    block[r] = bits[(size_t)(64 * w + r) * words + w0];
+                transpose64(block);
+                for (int i = i0; i < i1; i++)
+                    strip_bits[(size_t)(i - i0) * words + w] = block[i - i0];
+            }
+        }
+        if (td_ptr) {
+            RQA_OMP(omp parallel for schedule(static))
+            for (int i = i0; i < i1; i++) {
+                const uint64_t* row = &strip_bits[(size_t)(i - i0) * words];
+                int8_t* trow = td_ptr + (size_t)i * n2;
+                for (int j = 0; j < n2; j++)
+                    trow[j] = static_cast<int8_t>((row[j >> 6] >> (j & 63)) & 1);
+            }
+        }
+        // Line scanning carries run state from row to row, so stays serial.
+        for (int i = i0; i < i1; i++)
+            scanner.push_row(i, &strip_bits[(size_t)(i - i0) * words]);
+    }
+    scanner.finish();
+}
+
+// Run fused_scan and assemble the rqa_stats result tuple.
+static py::tuple fused_stats(SoAView emb_a, SoAView emb_b, int n2, int dim, bool symmetric,
+                             int metric, int rescale, float rad, int diag_ignore, int minl, bool return_matrices) {
+    py::array_t<int8_t> td;
+    int8_t* td_ptr = nullptr;
+    if (return_matrices) {
+        td = py::array_t<int8_t>({n2, n2});
+        td_ptr = static_cast<int8_t*>(td.request().ptr);
+    }
+
+    LineScanner scanner(n2, minl);
+    double trend1, trend2;
+    {
+        py::gil_scoped_release release;
+        fused_scan(emb_a, emb_b, n2, dim, symmetric, metric, rescale, rad, diag_ignore, td_ptr, scanner);
+        diag_trends(scanner.diag_pts, n2, diag_ignore, trend1, trend2);
+    }
+
+    py::object td_obj = return_matrices ? py::object(td) : py::object(py::none());
+    return summarize_rqa(td_obj, scanner.line_lengths(), scanner.recur, n2 - diag_ignore, theiler_npts(n2, diag_ignore),
+                         trend1, trend2, scanner.vertical_result(),
+                         rescale, rad, diag_ignore, minl, return_matrices);
+}
+
+/************************************
+ * rqa_dist_stats
+ *
+ * Fused rqa_dist + rqa_stats for time-delay embedded series: same results
+ * without materialising the distance matrix (see fused_scan). Identical
+ * inputs (auto-RQA) only compute the upper triangle. The thresholded
+ * matrix td is only built when return_matrices is true; otherwise td and
+ * mats are returned as None.
+ ************************************/
+py::tuple rqa_dist_stats(py::array_t<float, py::array::c_style | py::array::forcecast> a,
+                         py::array_t<float, py::array::c_style | py::array::forcecast> b, int dim, int lag,
+                         int rescale, float rad, int diag_ignore, int minl,
+                         std::string rqa_mode="auto", bool return_matrices=true,
+                         std::string metric="euclidean") {
+    int metric_id = parse_metric(metric);
+    auto buf_a = a.request();
+    auto buf_b = b.request();
+    if (buf_a.ndim < 1 || buf_b.ndim < 1)
+        throw std::runtime_error("Input arrays must have at least one dimension.");
+    if (rad <= 0)
+        throw std::runtime_error("Please use a scalar threshold > 0");
+    if (diag_ignore < 0)
+        throw std::runtime_error("Please use a non-negative integer for diag_ignore");
+    // For cross recurrence, ignore no diagonals.
+    if (rqa_mode == "cross")
+        diag_ignore = 0;
+
+    int n = buf_a.shape[0];
+    int n2 = embedded_length(n, dim, lag);
+    const float* ptr_a = static_cast<float*>(buf_a.ptr);
+    const float* ptr_b = static_cast<float*>(buf_b.ptr);
+    bool symmetric = (ptr_a == ptr_b) ||
+                     (buf_b.shape[0] == n && std::memcmp(ptr_a, ptr_b, n * sizeof(float)) == 0);
+    return fused_stats(embed_series(ptr_a, lag), embed_series(ptr_b, lag), n2, dim, symmetric,
+                       metric_id, rescale, rad, diag_ignore, minl, return_matrices);
+}
+
 /************************************
  * rqa_dist_multivariate
  *
  * Compute distances for multivariate time series where each column
  * represents a different dimension (no time-delay embedding needed).
  ************************************/
-py::dict rqa_dist_multivariate(py::array_t<float> data_a, py::array_t<float> data_b) {
+py::dict rqa_dist_multivariate(py::array_t<float> data_a, py::array_t<float> data_b,
+                               std::string metric="euclidean") {
+    int metric_id = parse_metric(metric);
     auto buf_a = data_a.request();
     auto buf_b = data_b.request();
     
@@ -624,25 +1305,19 @@ py::dict rqa_dist_multivariate(py::array_t<float> data_a, py::array_t<float> dat
     if (n_a < 10 || n_b < 10)
         throw std::runtime_error("Multivariate time series too short for reliable RQA analysis. Need at least 10 data points.");
     
-    float* ptr_a = static_cast<float*>(buf_a.ptr);
-    float* ptr_b = static_cast<float*>(buf_b.ptr);
-    
     auto result = py::array_t<float>({n_a, n_b});
     auto buf_res = result.request();
     float* res_ptr = static_cast<float*>(buf_res.ptr);
     
-    // Compute Euclidean distances between multivariate points
-    for (int i = 0; i < n_a; i++) {
-        for (int j = 0; j < n_b; j++) {
-            float sum_sq = 0.0f;
-            for (int d = 0; d < dim_a; d++) {
-                float val_a = *((float*)((char*)buf_a.ptr + i*buf_a.strides[0] + d*buf_a.strides[1]));
-                float val_b = *((float*)((char*)buf_b.ptr + j*buf_b.strides[0] + d*buf_b.strides[1]));
-                float diff = val_a - val_b;
-                sum_sq += diff * diff;
-            }
-            res_ptr[i * n_b + j] = std::sqrt(sum_sq);
-        }
+    // Distances between multivariate points, through the same
+    // SoA tile kernels as rqa_dist
+    {
+        py::gil_scoped_release release;
+        std::vector<float> storage_a, storage_b;
+        SoAView emb_a = soa_columns(buf_a, storage_a);
+        SoAView emb_b = soa_columns(buf_b, storage_b);
+        bool symmetric = n_a == n_b && same_vectors(emb_a, emb_b, n_a, dim_a);
+        dist_matrix(emb_a, emb_b, n_a, n_b, dim_a, metric_id, symmetric, res_ptr);
     }
     
     py::dict ds;
@@ -653,37 +1328,128 @@ py::dict rqa_dist_multivariate(py::array_t<float> data_a, py::array_t<float> dat
     return ds;
 }
 
+/************************************
+ * rqa_dist_multivariate_stats
+ *
+ * Fused rqa_dist_multivariate + rqa_stats: same results without
+ * materialising the distance matrix (see fused_scan).
+ ************************************/
+py::tuple rqa_dist_multivariate_stats(py::array_t<float> data_a, py::array_t<float> data_b,
+                                      int rescale, float rad, int diag_ignore, int minl,
+                                      std::string rqa_mode="auto", bool return_matrices=true,
+                                      std::string metric="euclidean") {
+    int metric_id = parse_metric(metric);
+    auto buf_a = data_a.request();
+    auto buf_b = data_b.request();
+    
+    if (buf_a.ndim != 2 || buf_b.ndim != 2)
+        throw std::runtime_error("Multivariate data must be 2D arrays (time x dimensions).");
+    if (buf_a.shape[1] != buf_b.shape[1])
+        throw std::runtime_error("Both datasets must have the same number of dimensions.");
+    if (buf_a.shape[0] < 10 || buf_b.shape[0] < 10)
+        throw std::runtime_error("Multivariate time series too short for reliable RQA analysis. Need at least 10 data points.");
+    if (buf_a.shape[0] != buf_b.shape[0])
+        throw std::runtime_error("Both datasets must have the same number of time points.");
+    if (rad <= 0)
+        throw std::runtime_error("Please use a scalar threshold > 0");
+    if (diag_ignore < 0)
+        throw std::runtime_error("Please use a non-negative integer for diag_ignore");
+    // For cross recurrence, ignore no diagonals.
+    if (rqa_mode == "cross")
+        diag_ignore = 0;
+
+    int n = buf_a.shape[0];
+    int dim = buf_a.shape[1];
+    std::vector<float> storage_a, storage_b;
+    SoAView emb_a = soa_columns(buf_a, storage_a);
+    SoAView emb_b = soa_columns(buf_b, storage_b);
+    bool symmetric = same_vectors(emb_a, emb_b, n, dim);
+    return fused_stats(emb_a, emb_b, n, dim, symmetric, metric_id, rescale, rad, diag_ignore, minl, return_matrices);
+}
+
+/************************************
+ * drp_band
+ *
+ * Number of lags kept on each side of the main diagonal: max_lag < 0
+ * (or beyond the matrix) means the full profile.
+ ************************************/
+static int drp_band(int n, int max_lag) {
+    return (max_lag < 0 || max_lag > n - 1) ? n - 1 : max_lag;
+}
+
+static py::array_t<double> drp_percent(const std::vector<long long>& counts, int n, int band) {
+    auto drp = py::array_t<double>({2 * band + 1});
+    double* drp_ptr = static_cast<double*>(drp.request().ptr);
+    for (int d = -band; d <= band; d++) {
+        int len = n - std::abs(d);
+        drp_ptr[d + band] = (len > 0) ? 100.0 * counts[d + band] / len : 0.0;
+    }
+    return drp;
+}
+
 /************************************
  * rqa_drp
  *
  * Compute the Diagonal Recurrence Profile (DRP) of a thresholded
-* recurrence matrix.
+* recurrence matrix. Rows are scanned contiguously and each cell is
+ * credited to its diagonal; only |lag| <= max_lag is visited.
  ************************************/
-py::array_t<double> rqa_drp(py::array_t<int8_t> thrd) {
+py::array_t<double> rqa_drp(py::array_t<int8_t> thrd, int max_lag = -1) {
     auto buf = thrd.request();
     if (buf.ndim != 2 || buf.shape[0] != buf.shape[1])
         throw std::runtime_error("Thresholded matrix must be square");
 
     int n = buf.shape[0];
-    int diagCount = 2 * n - 1;
-    int8_t* data = static_cast<int8_t*>(buf.ptr);
+    int band = drp_band(n, max_lag);
+    const int8_t* data = static_cast<int8_t*>(buf.ptr);
 
-    auto drp = py::array_t<double>({diagCount});
-    auto buf_drp = drp.request();
-    double* drp_ptr = static_cast<double*>(buf_drp.ptr);
+    std::vector<long long> counts(2 * band + 1, 0);
+    for (int i = 0; i < n; i++) {
+        const int8_t* row = data + (size_t)i * n;
+        int lo = std::max(0, i - band);
+        int hi = std::min(n - 1, i + band);
+        long long* diag = &counts[band - i + lo];   // diag[k] is the diagonal through (i, lo + k)
+        for (int j = lo; j <= hi; j++)
+            diag[j - lo] += (row[j] == 1);
+    }
+    return drp_percent(counts, n, band);
+}
 
-    for (int d = -(n - 1); d <= (n - 1); d++) {
-        int len = n - std::abs(d);
-        int count = 0;
-        for (int j = 0; j < len; j++) {
-            int row = (d >= 0) ? j : j - d;
-            int col = (d >= 0) ? j + d : j;
-            if (data[row * n + col] == 1) count++;
+/************************************
+ * rqa_drp_packed
+ *
+ * DRP of a bit-packed recurrence matrix from rqa_radius_packed. Only set
+ * bits are visited (lowest-set-bit scan per word), so sparse recurrence
+ * matrices cost far less than a full N x N sweep. With max_lag, only the
+ * words overlapping the |lag| <= max_lag band of each row are read.
+ ************************************/
+py::array_t<double> rqa_drp_packed(py::array_t<uint64_t> bits, int n, int max_lag = -1) {
+    auto buf = bits.request();
+    int words = (n + 63) / 64;
+    if (buf.ndim != 2 || buf.shape[0] != n || buf.shape[1] != words)
+        throw std::runtime_error("Packed matrix must have shape (n, ceil(n / 64))");
+
+    int band = drp_band(n, max_lag);
+    const uint64_t* bits_ptr = static_cast<uint64_t*>(buf.ptr);
+    std::vector<long long> counts(2 * band + 1, 0);
+    for (int i = 0; i < n; i++) {
+        const uint64_t* row = bits_ptr + (size_t)i * words;
+        int lo = std::max(0, i - band);
+        int hi = std::min(n - 1, i + band);
+        int offset = band - i;   // counts[j + offset] is the diagonal through (i, j)
+        for (int w = lo / 64; w <= hi / 64; w++) {
+            uint64_t word = row[w];
+            if (w == lo / 64)
+                word &= ~0ULL << (lo % 64);
+            if (w == hi / 64 && hi % 64 != 63)
+                word &= (1ULL << (hi % 64 + 1)) - 1;
+            while (word) {
+                counts[w * 64 + ctz64(word) + offset]++;
+                word &= word - 1;
+            }
         }
-        drp_ptr[d + n - 1] = (len > 0) ? 100.0 * count / len : 0.0;
     }
-
-    return drp;
+    return drp_percent(counts, n, band);
 }
 
 /************************************
@@ -694,12 +1460,17 @@ PYBIND11_MODULE(rqa_utils_cpp, m) {
 
     m.def("rqa_dist", &rqa_dist,
           "Compute distances between embedded vectors",
-          py::arg("a"), py::arg("b"), py::arg("dim"), py::arg("lag"));
+          py::arg("a"), py::arg("b"), py::arg("dim"), py::arg("lag"),
+          py::arg("metric") = "euclidean");
 
     m.def("rqa_radius", &rqa_radius,
           "Threshold the distance matrix",
           py::arg("dist"), py::arg("rescale"), py::arg("rad"), py::arg("diag_ignore"));
 
+    m.def("rqa_radius_packed", &rqa_radius_packed,
+          "Threshold the distance matrix into a bit-packed (n, ceil(n / 64)) uint64 matrix",
+          py::arg("dist"), py::arg("rescale"), py::arg("rad"), py::arg("diag_ignore"));
+
     m.def("rqa_line", &rqa_line,
           "Find diagonal lines and compute trends in a thresholded matrix",
           py::arg("thrd"), py::arg("diag_ignore"));
@@ -719,13 +1490,32 @@ PYBIND11_MODULE(rqa_utils_cpp, m) {
     m.def("rqa_stats", &rqa_stats,
           "Perform full RQA analysis on a distance matrix, including vertical metrics and divergence",
           py::arg("d"), py::arg("rescale"), py::arg("rad"),
-          py::arg("diag_ignore"), py::arg("minl"), py::arg("rqa_mode") = "auto");
+          py::arg("diag_ignore"), py::arg("minl"), py::arg("rqa_mode") = "auto",
+          py::arg("return_matrices") = true);
+
+    m.def("rqa_dist_stats", &rqa_dist_stats,
+          "Fused distance + RQA analysis that never materialises the distance matrix",
+          py::arg("a"), py::arg("b"), py::arg("dim"), py::arg("lag"),
+          py::arg("rescale"), py::arg("rad"), py::arg("diag_ignore"), py::arg("minl"),
+          py::arg("rqa_mode") = "auto", py::arg("return_matrices") = true,
+          py::arg("metric") = "euclidean");
 
     m.def("rqa_dist_multivariate", &rqa_dist_multivariate,
           "Compute distances for multivariate time series (no embedding needed)",
-          py::arg("data_a"), py::arg("data_b"));
+          py::arg("data_a"), py::arg("data_b"), py::arg("metric") = "euclidean");
+
+    m.def("rqa_dist_multivariate_stats", &rqa_dist_multivariate_stats,
+          "Fused rqa_dist_multivariate + rqa_stats without materialising the distance matrix",
+          py::arg("data_a"), py::arg("data_b"), py::arg("rescale"), py::arg("rad"),
+          py::arg("diag_ignore"), py::arg("minl"),
+          py::arg("rqa_mode") = "auto", py::arg("return_matrices") = true,
+          py::arg("metric") = "euclidean");
 
     m.def("rqa_drp", &rqa_drp,
           "Compute the Diagonal Recurrence Profile (DRP) of a thresholded recurrence matrix",
-          py::arg("thrd"));
+          py::arg("thrd"), py::arg("max_lag") = -1);
+
+    m.def("rqa_drp_packed", &rqa_drp_packed,
+          "Compute the Diagonal Recurrence Profile (DRP) of a bit-packed recurrence matrix",
+          py::arg("bits"), py::arg("n"), py::arg("max_lag") = -1);
 }
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import hashlib
+import numpy as np
+
+from utils import rqa_utils_cpp
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; hashlib.blake2b is slower but always present
+    xxhash = None
+
+# Distance matrices are float32 n x n, so the budget is in bytes rather than entries
+_max_bytes = 512 * 1024 ** 2
+_cache = OrderedDict()
+_cache_bytes = 0
+
+
+def _digest(data):
+    # Hash the float32 buffer rqa_utils_cpp actually sees, plus its shape
+    arr = np.ascontiguousarray(data, dtype=np.float32)
+    if xxhash is not None:
+        h = xxhash.xxh3_64_intdigest(arr.view(np.uint8))
+    else:
+        h = hashlib.blake2b(arr.view(np.uint8), digest_size=8).hexdigest()
+    return arr.shape, h
+
+
+def _key(dataX, dataY, dim, lag, metric):
+    kx = _digest(dataX)
+    ky = kx if dataY is dataX else _digest(dataY)
+    return kx, ky, int(dim), int(lag), metric
+
+
+def lookup(dataX, dataY, dim, lag, metric="euclidean"):
+    """
+    Return the cached rqa_dist result for these inputs, or None.
+    Never computes anything, so callers can fall back to the fused path.
+    """
+    key = _key(dataX, dataY, dim, lag, metric)
+    ds = _cache.get(key)
+    if ds is not None:
+        _cache.move_to_end(key)
+    return ds
+
+
+def rqa_dist(dataX, dataY, dim, lag, metric="euclidean"):
+    """
+    Cached counterpart of rqa_utils_cpp.rqa_dist.
+
+    Results are keyed on a hash of the (normalized) data plus dim, lag and metric,
+    and evicted least-recently-used once the cache exceeds its byte budget.
+    The returned distance matrix is read-only because it is shared.
+    """
+    global _cache_bytes
+    key = _key(dataX, dataY, dim, lag, metric)
+    ds = _cache.get(key)
+    if ds is not None:
+        _cache.move_to_end(key)
+        return ds
+
+    ds = rqa_utils_cpp.rqa_dist(dataX, dataY, dim=dim, lag=lag, metric=metric)
+    ds["d"].flags.writeable = False
+    nbytes = ds["d"].nbytes
+    if nbytes <= _max_bytes:
+        _cache[key] = ds
+        _cache_bytes += nbytes
+        while _cache_bytes > _max_bytes:
+            _, old = _cache.popitem(last=False)
+            _cache_bytes -= old["d"].nbytes
+    return ds
+
+
+def set_cache_size(max_bytes):
+    """
+    Set the cache budget in bytes (0 disables caching) and evict to fit.
+    """
+    global _max_bytes, _cache_bytes
+    _max_bytes = int(max_bytes)
+    while _cache and _cache_bytes > _max_bytes:
+        _, old = _cache.popitem(last=False)
+        _cache_bytes -= old["d"].nbytes
+
+
+def clear_cache():
+    """
+    Drop all cached distance matrices.
+    """
+    global _cache_bytes
+    _cache.clear()
+    _cache_bytes = 0
@@ -0,0 +1,79 @@
+// rqa_utils_cu.cu
+//
+// CUDA kernel for rqa_dist, compiled at runtime by utils/rqa_utils_gpu.py
+// (cupy.RawModule). BLOCK is supplied as a -D option by the loader.
+
+#ifndef BLOCK
+#define BLOCK 16
+#endif
+
+// Metric codes, matching DistMetric in rqa_utils.cpp
+#define METRIC_EUCLIDEAN 0
+#define METRIC_CHEBYSHEV 2
+#define METRIC_CITYBLOCK 3
+
+/************************************
+ * rqa_dist_kernel
+ *
+ * One thread per recurrence cell (i, j) on a 2D grid of BLOCK x BLOCK
+ * thread blocks. The embedded vectors of the block's BLOCK rows of x and
+ * BLOCK columns of y are staged in shared memory, so each vector is read
+ * from global memory once per tile instead of once per cell.
+ *
+ * metric selects Euclidean, Chebyshev (max) or cityblock (sum) distances.
+ * Products and sums use round-to-nearest intrinsics (no FMA contraction)
+ * so distances match the CPU extension bit for bit.
+ ************************************/
+extern "C" __global__ void rqa_dist_kernel(const float* __restrict__ x,
+                                           const float* __restrict__ y,
+                                           float* __restrict__ d,
+                                           int n2, int dim, int lag, int metric) {
+    extern __shared__ float sh[];
+    float* sx = sh;                 // BLOCK embedded row vectors of x
+    float* sy = sh + BLOCK * dim;   // BLOCK embedded column vectors of y
+
+    int tx = threadIdx.x;
+    int ty = threadIdx.y;
+    int i = blockIdx.y * BLOCK + ty;
+    int j = blockIdx.x * BLOCK + tx;
+
+    for (int k = tx; k < dim; k += BLOCK) {
+        if (i < n2)
+            sx[ty * dim + k] = __ldg(&x[i + k * lag]);
+    }
+    for (int k = ty; k < dim; k += BLOCK) {
+        if (j < n2)
+            sy[tx * dim + k] = __ldg(&y[j + k * lag]);
+    }
+    __syncthreads();
+
+    if (i >= n2 || j >= n2)
+        return;
+
+    const float* a = &sx[ty * dim];
+    const float* b = &sy[tx * dim];
+    float out;
+    if (dim > 1 && metric == METRIC_CHEBYSHEV) {
+        float acc = 0.0f;
+        for (int k = 0; k < dim; k++) {
+            float ad = fabsf(a[k] - b[k]);
+            acc = (acc > ad) ? acc : ad;
+        }
+        out = acc;
+    } else if (dim > 1 && metric == METRIC_CITYBLOCK) {
+        float acc = 0.0f;
+        for (int k = 0; k < dim; k++)
+            acc = __fadd_rn(acc, fabsf(a[k] - b[k]));
+        out = acc;
+    } else if (dim > 1) {
+        float sum_sq = 0.0f;
+        for (int k = 0; k < dim; k++) {
+            float diff = a[k] - b[k];
+            sum_sq = __fadd_rn(sum_sq, __fmul_rn(diff, diff));
+        }
+        out = sqrtf(sum_sq);
+    } else {
+        out = fabsf(a[0] - b[0]);
+    }
+    d[(size_t)i * n2 + j] = out;
+}
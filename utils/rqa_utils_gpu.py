@@ -0,0 +1,88 @@
+import os
+import numpy as np
+
+try:
+    import cupy as cp
+except ImportError:  # cupy is optional; callers fall back to rqa_utils_cpp
+    cp = None
+
+_BLOCK = 16
+_kernel = None
+# Metric codes understood by rqa_dist_kernel
+_METRICS = {"euclidean": 0, "chebyshev": 2, "cityblock": 3}
+
+
+def is_available():
+    """
+    Return True when cupy is installed and a CUDA device is visible.
+    """
+    if cp is None:
+        return False
+    try:
+        return cp.cuda.runtime.getDeviceCount() > 0
+    except cp.cuda.runtime.CUDARuntimeError:
+        return False
+
+
+def _get_kernel():
+    # Compile rqa_utils_cu.cu once per process
+    global _kernel
+    if _kernel is None:
+        src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rqa_utils_cu.cu")
+        with open(src_path) as f:
+            src = f.read()
+        module = cp.RawModule(code=src, options=(f"-DBLOCK={_BLOCK}",))
+        _kernel = module.get_function("rqa_dist_kernel")
+    return _kernel
+
+
+def rqa_dist_gpu(dataX, dataY, dim, lag, metric="euclidean"):
+    """
+    GPU counterpart of rqa_utils_cpp.rqa_dist.
+
+    Parameters
+    ----------
+    dataX, dataY : np.ndarray
+        1D time series of equal length.
+    dim : int
+        Embedding dimension.
+    lag : int
+        Embedding lag.
+    metric : str
+        "euclidean", "chebyshev" or "cityblock", as in rqa_dist.
+
+    Returns
+    -------
+    dict
+        {"dim", "lag", "d"} with "d" the (n2, n2) float32 distance matrix
+        copied back to host memory, as returned by rqa_dist.
+
+    Raises
+    ------
+    RuntimeError
+        If no CUDA device is available, the metric is unknown or the series
+        is too short for the embedding parameters.
+    """
+    if not is_available():
+        raise RuntimeError("No CUDA device available (install cupy for GPU support).")
+
+    if metric not in _METRICS:
+        raise RuntimeError(f"Unknown metric '{metric}' (use 'euclidean', 'chebyshev' or 'cityblock').")
+
+    x = cp.ascontiguousarray(cp.asarray(dataX, dtype=cp.float32).ravel())
+    y = cp.ascontiguousarray(cp.asarray(dataY, dtype=cp.float32).ravel())
+    n2 = x.shape[0] - lag * (dim - 1)
+    if n2 <= 0:
+        raise RuntimeError("Not enough data for these embedding parameters.")
+    if n2 < 10:
+        raise RuntimeError("Time series too short for reliable RQA analysis. Need at least "
+                           f"{lag * (dim - 1) + 10} data points.")
+
+    d = cp.empty((n2, n2), dtype=cp.float32)
+    blocks = (n2 + _BLOCK - 1) // _BLOCK
+    _get_kernel()(
+        (blocks, blocks), (_BLOCK, _BLOCK),
+        (x, y, d, np.int32(n2), np.int32(dim), np.int32(lag), np.int32(_METRICS[metric])),
+        shared_mem=2 * _BLOCK * dim * np.dtype(np.float32).itemsize,
+    )
+    return {"dim": dim, "lag": lag, "d": cp.asnumpy(d)}